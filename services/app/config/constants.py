@@ -38,6 +38,9 @@ COLLECTIONS = {
     "contacts": "contacts"
 }
 
+# Case-insensitive collation shared by name lookups and their indexes
+CASE_INSENSITIVE_COLLATION = {"locale": "en", "strength": 2}
+
 # Default Values
 DEFAULT_KEYWORDS = "Software Engineer"
 DEFAULT_CRON_SCHEDULE = "0 2 * * *"  # 2:00 AM daily
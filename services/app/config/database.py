@@ -4,15 +4,16 @@ Converted from backend/src/config/database.js
 """
 import os
 from typing import Optional
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import AsyncMongoClient
+from pymongo.asynchronous.database import AsyncDatabase
 from pymongo.errors import ConnectionFailure
 import logging
 
 logger = logging.getLogger(__name__)
 
 class Database:
-    client: Optional[AsyncIOMotorClient] = None
-    database: Optional[AsyncIOMotorDatabase] = None
+    client: Optional[AsyncMongoClient] = None
+    database: Optional[AsyncDatabase] = None
 
 db = Database()
 
@@ -32,10 +33,10 @@ async def connect_to_mongo():
         safe_uri = mongo_uri.replace(mongo_uri.split("@")[0].split("//")[1], "***:***") if "@" in mongo_uri else mongo_uri
         logger.info(f" Database URI: {safe_uri}")
 
-        # Connect to MongoDB with Motor AsyncIOMotorClient - Optimized for Render
-        db.client = AsyncIOMotorClient(
+        # Connect with PyMongo's native async client (no thread-pool hop per operation) - Optimized for Render
+        db.client = AsyncMongoClient(
             mongo_uri,
-            maxPoolSize=5,  # Reduced pool size for free tier
+            maxPoolSize=int(os.getenv("MONGODB_MAX_POOL_SIZE", "5")),  # Small shared pool for free tier
             serverSelectionTimeoutMS=1000,  # Very fast timeout for Render
             socketTimeoutMS=5000,  # Quick socket timeout
             connectTimeoutMS=1000,  # Quick connection timeout
@@ -72,7 +73,7 @@ async def connect_to_mongo():
 async def close_mongo_connection():
     """Close MongoDB connection"""
     if db.client:
-        db.client.close()
+        await db.client.close()
         logger.info("🔴 MongoDB connection closed")
 
 def get_database():
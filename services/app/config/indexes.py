@@ -5,23 +5,44 @@ Based on MongoDB best practices for query optimization
 """
 import asyncio
 import logging
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import OperationFailure
 from .database import get_database
-from .constants import COLLECTIONS
+from .constants import COLLECTIONS, CASE_INSENSITIVE_COLLATION
 
 logger = logging.getLogger(__name__)
 
-
-async def create_companies_indexes(db: AsyncIOMotorDatabase):
+# Indexes replaced by a renamed or reshaped one; dropped at startup so existing deployments don't keep
+# maintaining them on every write
+SUPERSEDED_INDEXES = {
+    "companies": (
+        "idx_companies_name",  # -> idx_companies_name_ci (case-insensitive collation)
+        "idx_companies_domain",  # -> idx_companies_domain_unique (sparse -> partial)
+        "idx_companies_apollo_id",  # -> idx_companies_apollo_id_unique (sparse -> partial)
+    ),
+    "contacts": (
+        "idx_contacts_company_created",  # -> idx_contacts_company_created_id (keyset pagination)
+        "idx_contacts_apollo_id",  # -> idx_contacts_apollo_id_unique (sparse -> partial)
+        "idx_contacts_snov_id",  # -> idx_contacts_snov_id_unique (sparse -> partial)
+    ),
+}
+# Server error codes for "collection does not exist" and "index not found"
+_NAMESPACE_NOT_FOUND = 26
+_INDEX_NOT_FOUND = 27
+
+
+def _unique_string_key(field: str) -> dict:
+    """Options for a unique index over documents where `field` is a string.
+    Documents store missing keys as explicit nulls, which a sparse index would still index (and collide on)"""
+    return {"unique": True, "partialFilterExpression": {field: {"$type": "string"}}}
+
+
+async def create_companies_indexes(db: AsyncDatabase):
     """Create indexes for companies collection"""
     collection = db[COLLECTIONS["companies"]]
     
     # Primary lookup indexes
-    await collection.create_index("domain", unique=True, sparse=True, name="idx_companies_domain")
-    await collection.create_index("name", name="idx_companies_name")
-    
-    # External API deduplication
-    await collection.create_index("apollo_id", unique=True, sparse=True, name="idx_companies_apollo_id")
+    await collection.create_index("name", collation=CASE_INSENSITIVE_COLLATION, name="idx_companies_name_ci")
     
     # Temporal indexes
     await collection.create_index([("created_at", -1)], name="idx_companies_created_at")
@@ -30,21 +51,21 @@ async def create_companies_indexes(db: AsyncIOMotorDatabase):
     # Compound indexes for common queries
     await collection.create_index([("domain", 1), ("name", 1)], name="idx_companies_domain_name")
     
+    # Unique keys last: existing duplicates make these fail without skipping the indexes above
+    await collection.create_index("domain", name="idx_companies_domain_unique", **_unique_string_key("domain"))
+    # External API deduplication
+    await collection.create_index("apollo_id", name="idx_companies_apollo_id_unique", **_unique_string_key("apollo_id"))
+    
     logger.info("✅ Created companies collection indexes")
 
 
-async def create_contacts_indexes(db: AsyncIOMotorDatabase):
+async def create_contacts_indexes(db: AsyncDatabase):
     """Create indexes for contacts collection"""
     collection = db[COLLECTIONS["contacts"]]
     
     # Primary lookup indexes
-    await collection.create_index("email", unique=True, name="idx_contacts_email")
     await collection.create_index("company_id", name="idx_contacts_company_id")
     
-    # External API deduplication
-    await collection.create_index("apollo_id", unique=True, sparse=True, name="idx_contacts_apollo_id")
-    await collection.create_index("snov_id", unique=True, sparse=True, name="idx_contacts_snov_id")
-    
     # Temporal indexes
     await collection.create_index([("created_at", -1)], name="idx_contacts_created_at")
     await collection.create_index([("updated_at", -1)], name="idx_contacts_updated_at")
@@ -53,12 +74,18 @@ async def create_contacts_indexes(db: AsyncIOMotorDatabase):
     await collection.create_index([("company_id", 1), ("title", 1)], name="idx_contacts_company_title")
     await collection.create_index([("company_id", 1), ("seniority", 1)], name="idx_contacts_company_seniority")
     await collection.create_index([("company_id", 1), ("department", 1)], name="idx_contacts_company_department")
-    await collection.create_index([("company_id", 1), ("created_at", -1)], name="idx_contacts_company_created")
+    await collection.create_index([("company_id", 1), ("created_at", -1), ("_id", -1)], name="idx_contacts_company_created_id")
+    
+    # Unique keys last, as for companies
+    await collection.create_index("email", unique=True, name="idx_contacts_email")
+    # External API deduplication
+    await collection.create_index("apollo_id", name="idx_contacts_apollo_id_unique", **_unique_string_key("apollo_id"))
+    await collection.create_index("snov_id", name="idx_contacts_snov_id_unique", **_unique_string_key("snov_id"))
     
     logger.info("✅ Created contacts collection indexes")
 
 
-async def create_jobs_indexes(db: AsyncIOMotorDatabase):
+async def create_jobs_indexes(db: AsyncDatabase):
     """Create indexes for jobs collection (updated for company relationships)"""
     collection = db[COLLECTIONS["jobs"]]
     
@@ -88,6 +115,39 @@ async def create_jobs_indexes(db: AsyncIOMotorDatabase):
     logger.info("✅ Created jobs collection indexes")
 
 
+async def drop_superseded_indexes(db: AsyncDatabase):
+    """Drop indexes listed in SUPERSEDED_INDEXES, ignoring ones that are already gone"""
+    for collection_key, index_names in SUPERSEDED_INDEXES.items():
+        collection = db[COLLECTIONS[collection_key]]
+        for index_name in index_names:
+            try:
+                await collection.drop_index(index_name)
+                logger.info(f"🗑️ Dropped superseded index: {collection.name}.{index_name}")
+            except OperationFailure as e:
+                if e.code not in (_NAMESPACE_NOT_FOUND, _INDEX_NOT_FOUND):
+                    raise
+
+
+async def ensure_indexes():
+    """Create companies/contacts indexes on the connected database at startup (idempotent, never raises)"""
+    db = get_database()
+    if db is None:
+        logger.warning("⚠️ Skipping index creation - database not connected")
+        return
+    
+    try:
+        await drop_superseded_indexes(db)
+    except Exception as e:
+        logger.warning(f"⚠️ Dropping superseded indexes failed: {e}")
+    
+    # Jobs indexes stay with the manual create_all_indexes script
+    for create_indexes in (create_companies_indexes, create_contacts_indexes):
+        try:
+            await create_indexes(db)
+        except Exception as e:
+            logger.warning(f"⚠️ Index creation failed in {create_indexes.__name__}: {e}")
+
+
 async def create_all_indexes():
     """Create all database indexes"""
     try:
@@ -103,6 +163,7 @@ async def create_all_indexes():
         logger.info("🔧 Creating database indexes...")
 
         # Create indexes for all collections
+        await drop_superseded_indexes(db)
         await create_companies_indexes(db)
         await create_contacts_indexes(db)
         await create_jobs_indexes(db)
@@ -117,14 +178,14 @@ async def create_all_indexes():
 async def drop_all_indexes():
     """Drop all custom indexes (for development/testing)"""
     try:
-        db = await get_database()
+        db = get_database()
         
         logger.info("🗑️ Dropping all custom indexes...")
         
         # Drop indexes for all collections (except _id)
         for collection_name in [COLLECTIONS["companies"], COLLECTIONS["contacts"], COLLECTIONS["jobs"]]:
             collection = db[collection_name]
-            indexes = await collection.list_indexes().to_list(length=None)
+            indexes = await (await collection.list_indexes()).to_list(length=None)
             
             for index in indexes:
                 index_name = index.get("name")
@@ -145,11 +206,11 @@ async def drop_all_indexes():
 async def list_all_indexes():
     """List all indexes for debugging"""
     try:
-        db = await get_database()
+        db = get_database()
         
         for collection_name in [COLLECTIONS["companies"], COLLECTIONS["contacts"], COLLECTIONS["jobs"]]:
             collection = db[collection_name]
-            indexes = await collection.list_indexes().to_list(length=None)
+            indexes = await (await collection.list_indexes()).to_list(length=None)
             
             logger.info(f"\n📋 Indexes for {collection_name}:")
             for index in indexes:
@@ -8,6 +8,8 @@ import logging
 from dotenv import load_dotenv
 
 from .config.database import connect_to_mongo, close_mongo_connection
+from .config.indexes import ensure_indexes
+from .services.enrichment_service import enrichment_service
 from .routes.auth import router as auth_router
 from .routes.health import router as health_router
 from .routes.agents import router as agent_router
@@ -39,6 +41,7 @@ async def lifespan(app: FastAPI):
         try:
             await connect_to_mongo()
             logger.info("✅ Database connection established")
+            await ensure_indexes()
         except Exception as e:
             logger.warning(f"⚠️ Database connection failed: {e}")
             logger.warning("⚠️ Continuing without database - some features may be limited")
@@ -47,10 +50,17 @@ async def lifespan(app: FastAPI):
     asyncio.create_task(connect_db())
     logger.info("🔄 Database connection started in background")
 
+    # Open the shared Apollo HTTP session now rather than on the first enrichment
+    asyncio.create_task(enrichment_service.warm_up())
+
     # start_scheduler()
     yield
     # Shutdown
     # stop_scheduler()
+    try:
+        await enrichment_service.close_session()
+    except Exception as e:
+        logger.warning(f"⚠️ Error closing Apollo HTTP session: {e}")
     try:
         await close_mongo_connection()
     except Exception as e:
@@ -132,7 +132,7 @@ class CandidateService:
         collection = cls.get_collection()
         
         # Create candidate document
-        candidate_dict = candidate_data.dict()
+        candidate_dict = candidate_data.model_dump()
         candidate_dict.update({
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
@@ -217,7 +217,7 @@ class CandidateService:
         collection = cls.get_collection()
 
         # Prepare update data
-        update_dict = {k: v for k, v in update_data.dict(exclude_unset=True).items() if v is not None}
+        update_dict = update_data.model_dump(exclude_unset=True, exclude_none=True)
 
         if update_dict:
             update_dict["updated_at"] = datetime.utcnow()
@@ -139,7 +139,7 @@ class JobService:
         collection = cls.get_collection()
         
         # Create job document
-        job_dict = job_data.dict()
+        job_dict = job_data.model_dump()
         job_dict.update({
             "scraped_at": datetime.utcnow(),
             "created_at": datetime.utcnow(),
@@ -163,7 +163,7 @@ class JobService:
         # Prepare job documents
         job_docs = []
         for job_data in jobs_data:
-            job_dict = job_data.dict()
+            job_dict = job_data.model_dump()
             job_dict.update({
                 "scraped_at": datetime.utcnow(),
                 "created_at": datetime.utcnow(),
@@ -243,7 +243,7 @@ class JobService:
             object_id = ObjectId(job_id)
             
             # Prepare update data
-            update_dict = {k: v for k, v in update_data.dict(exclude_unset=True).items() if v is not None}
+            update_dict = update_data.model_dump(exclude_unset=True, exclude_none=True)
             
             if update_dict:
                 update_dict["updated_at"] = datetime.utcnow()
@@ -1,12 +1,14 @@
 """
 User Model
 Converted from backend/src/models/User.js
-Pydantic models with Motor async MongoDB driver
+Pydantic models with PyMongo async MongoDB driver
 """
 from datetime import datetime
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Dict, Optional
 from pydantic import BaseModel, EmailStr, Field
 from bson import ObjectId
+from fastapi.concurrency import run_in_threadpool
 from ..config.database import get_database
 from ..config.constants import COLLECTIONS
 from ..auth.jwt_handler import hash_password, verify_password
@@ -73,6 +75,17 @@ class UserProfile(BaseModel):
             datetime: lambda v: v.isoformat()
         }
 
+@lru_cache(maxsize=1024)
+def _profile_json(user_id: str, name: str, email: str, created_at: datetime, updated_at: datetime) -> Dict[str, Any]:
+    """Serialize a user profile once per (user, updated_at) snapshot"""
+    return UserProfile(
+        id=user_id,
+        name=name,
+        email=email,
+        created_at=created_at,
+        updated_at=updated_at
+    ).model_dump(mode='json')
+
 class UserService:
     """User service for database operations"""
     
@@ -90,12 +103,12 @@ class UserService:
         collection = cls.get_collection()
         
         # Check if user already exists
-        existing_user = await collection.find_one({"email": user_data.email})
+        existing_user = await collection.find_one({"email": user_data.email}, projection={"_id": 1})
         if existing_user:
             raise ValueError("User with this email already exists")
         
-        # Hash password
-        hashed_password = hash_password(user_data.password)
+        # Hash password (bcrypt is CPU-bound, keep it off the event loop)
+        hashed_password = await run_in_threadpool(hash_password, user_data.password)
         
         # Create user document
         user_dict = {
@@ -207,3 +220,14 @@ class UserService:
             created_at=user.created_at,
             updated_at=user.updated_at
         )
+    
+    @classmethod
+    def to_profile_json(cls, user: UserInDB) -> Dict[str, Any]:
+        """Convert UserInDB to a JSON-ready profile dict (memoized per updated_at)"""
+        return dict(_profile_json(
+            str(user.id),
+            user.name,
+            user.email,
+            user.created_at,
+            user.updated_at
+        ))
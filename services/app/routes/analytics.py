@@ -108,7 +108,7 @@ async def get_dashboard_analytics(
             {"$sort": {"count": -1}}
         ]
         
-        source_results = await jobs_collection.aggregate(source_pipeline).to_list(10)
+        source_results = await (await jobs_collection.aggregate(source_pipeline)).to_list(10)
         total_jobs = sum(result["count"] for result in source_results)
         
         source_breakdown = []
@@ -263,7 +263,7 @@ async def get_trend_analytics(
         if metric == "matches":
             pipeline[0]["$match"]["is_active"] = True
         
-        results = await collection.aggregate(pipeline).to_list(days)
+        results = await (await collection.aggregate(pipeline)).to_list(days)
         
         # Format results
         trend_data = []
@@ -350,7 +350,7 @@ async def get_performance_metrics(
             }}
         ]
         
-        match_stats = await matches_collection.aggregate(match_pipeline).to_list(1)
+        match_stats = await (await matches_collection.aggregate(match_pipeline)).to_list(1)
         match_quality = match_stats[0] if match_stats else {
             "avg_score": 0, "max_score": 0, "min_score": 0, "total_matches": 0
         }
@@ -85,7 +85,7 @@ async def get_job(
             send_not_found_error("Job not found")
         
         return send_success(
-            data={"job": JobService.to_response(job).dict()},
+            data={"job": JobService.to_response(job).model_dump()},
             message="Job retrieved successfully"
         )
     except HTTPException:
@@ -105,7 +105,7 @@ async def create_job(
     try:
         job = await JobService.create_job(job_data)
         return send_success(
-            data={"job": JobService.to_response(job).dict()},
+            data={"job": JobService.to_response(job).model_dump()},
             message="Job created successfully",
             status_code=201
         )
@@ -128,7 +128,7 @@ async def update_job(
             send_not_found_error("Job not found")
         
         return send_success(
-            data={"job": JobService.to_response(job).dict()},
+            data={"job": JobService.to_response(job).model_dump()},
             message="Job updated successfully"
         )
     except HTTPException:
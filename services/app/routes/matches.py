@@ -156,7 +156,7 @@ async def get_match_statistics():
             }}
         ]
 
-        score_stats = await collection.aggregate(pipeline).to_list(1)
+        score_stats = await (await collection.aggregate(pipeline)).to_list(1)
         avg_score = score_stats[0]["avg_score"] if score_stats else 0.0
         max_score = score_stats[0]["max_score"] if score_stats else 0.0
         min_score = score_stats[0]["min_score"] if score_stats else 0.0
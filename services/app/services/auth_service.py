@@ -6,6 +6,7 @@ Handles user registration, login, and token management
 import logging
 from typing import Dict, Any, Optional
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from ..models.user import UserService, UserCreate, UserInDB
 from ..auth.jwt_handler import generate_tokens, verify_refresh_token
 from ..utils.response_helper import send_error, send_auth_error
@@ -31,7 +32,7 @@ class AuthService:
 
             # Generate tokens
             logger.info("Generating JWT tokens...")
-            tokens = generate_tokens({
+            tokens = await run_in_threadpool(generate_tokens, {
                 "_id": str(user.id),
                 "email": user.email,
                 "name": user.name
@@ -39,12 +40,8 @@ class AuthService:
             logger.info("JWT tokens generated successfully")
 
             # Return user profile and tokens
-            logger.info("Converting user to profile...")
-            user_profile = UserService.to_profile(user)
-            logger.info("User profile created successfully")
-
             logger.info("Serializing user profile...")
-            user_dict = user_profile.model_dump(mode='json')
+            user_dict = UserService.to_profile_json(user)
             logger.info("User profile serialized successfully")
 
             result = {
@@ -79,21 +76,20 @@ class AuthService:
         if not user:
             send_auth_error("Invalid email or password")
 
-        # Verify password
-        if not UserService.verify_password(user, password):
+        # Verify password (bcrypt is CPU-bound, keep it off the event loop)
+        if not await run_in_threadpool(UserService.verify_password, user, password):
             send_auth_error("Invalid email or password")
 
         # Generate tokens
-        tokens = generate_tokens({
+        tokens = await run_in_threadpool(generate_tokens, {
             "_id": str(user.id),
             "email": user.email,
             "name": user.name
         })
 
         # Return user profile and tokens
-        user_profile = UserService.to_profile(user)
         return {
-            "user": user_profile.model_dump(mode='json'),
+            "user": UserService.to_profile_json(user),
             "tokens": tokens
         }
     
@@ -117,15 +113,14 @@ class AuthService:
                 send_auth_error("User not found")
 
             # Generate new tokens
-            tokens = generate_tokens({
+            tokens = await run_in_threadpool(generate_tokens, {
                 "_id": str(user.id),
                 "email": user.email,
                 "name": user.name
             })
 
-            user_profile = UserService.to_profile(user)
             return {
-                "user": user_profile.model_dump(mode='json'),
+                "user": UserService.to_profile_json(user),
                 "tokens": tokens
             }
 
@@ -143,7 +138,6 @@ class AuthService:
         if not user:
             send_error("User not found", 404)
 
-        user_profile = UserService.to_profile(user)
         return {
-            "user": user_profile.model_dump(mode='json')
+            "user": UserService.to_profile_json(user)
         }
@@ -2,262 +2,239 @@
 Company Service
 Handles CRUD operations for companies with duplicate checking and enrichment
 """
+import asyncio
 import logging
+import re
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from bson import ObjectId
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.asynchronous.collection import AsyncCollection
 
 from ..config.database import get_database
-from ..config.constants import COLLECTIONS
+from ..config.constants import COLLECTIONS, CASE_INSENSITIVE_COLLATION
 from ..models.company import Company, CompanyCreate, CompanyUpdate, CompanyResponse
+from ..utils.caching import MemoryCache
+from ..utils.common_utils import log_errors
 
 logger = logging.getLogger(__name__)
 
 
+def _to_company_response(company: Dict[str, Any]) -> CompanyResponse:
+    """Build a response from a stored company document without re-validating it"""
+    company["id"] = str(company.pop("_id"))
+    return CompanyResponse.model_construct(**company)
+
+
 class CompanyService:
     """Service for managing company data with duplicate checking"""
     
     def __init__(self):
-        self.db: Optional[AsyncIOMotorDatabase] = None
         self.collection_name = COLLECTIONS["companies"]
+        self._collection: Optional[AsyncCollection] = None
+        # Short-lived dedup cache: the same domain/Apollo ID recurs across enrichment batches
+        self._lookup_cache = MemoryCache(default_ttl=300, max_entries=10_000)
     
-    async def _get_db(self) -> AsyncIOMotorDatabase:
-        """Get database connection"""
-        if self.db is None:
-            self.db = get_database()  # get_database() is not async
-        return self.db
-    
-    async def _get_collection(self):
-        """Get companies collection"""
-        db = await self._get_db()
-        return db[self.collection_name]
+    def _get_collection(self) -> AsyncCollection:
+        """Get companies collection (resolved once, on first use)"""
+        if self._collection is None:
+            self._collection = get_database()[self.collection_name]
+        return self._collection
     
     # CRUD Operations
     
+    @log_errors("create_company")
     async def create_company(self, company_data: CompanyCreate) -> CompanyResponse:
         """Create a new company"""
-        try:
-            collection = await self._get_collection()
-            
-            # Convert to Company model for validation
-            company = Company(**company_data.dict())
-            
-            # Insert into database
-            result = await collection.insert_one(company.dict(by_alias=True))
-            
-            # Fetch the created company
-            created_company = await collection.find_one({"_id": result.inserted_id})
-            
-            logger.info(f"✅ Created company: {company.name} (ID: {result.inserted_id})")
-            
-            return CompanyResponse(
-                id=str(created_company["_id"]),
-                **{k: v for k, v in created_company.items() if k != "_id"}
-            )
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to create company {company_data.name}: {e}")
-            raise
-    
+        collection = self._get_collection()
+        
+        # Convert to Company model for validation
+        company = Company(**company_data.model_dump())
+        
+        # Insert into database; the inserted document is already complete, so no re-read
+        created_company = company.model_dump(by_alias=True)
+        result = await collection.insert_one(created_company)
+        
+        logger.info("Created company: %s (ID: %s)", company.name, result.inserted_id)
+        
+        return _to_company_response(created_company)
+    
+    @log_errors("get_company_by_id")
     async def get_company_by_id(self, company_id: str) -> Optional[CompanyResponse]:
         """Get company by ID"""
-        try:
-            collection = await self._get_collection()
-            company = await collection.find_one({"_id": ObjectId(company_id)})
-            
-            if company:
-                return CompanyResponse(
-                    id=str(company["_id"]),
-                    **{k: v for k, v in company.items() if k != "_id"}
-                )
-            return None
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to get company {company_id}: {e}")
-            return None
-    
+        collection = self._get_collection()
+        company = await collection.find_one({"_id": ObjectId(company_id)})
+        
+        if company:
+            return _to_company_response(company)
+        return None
+    
+    @log_errors("update_company")
     async def update_company(self, company_id: str, update_data: CompanyUpdate) -> Optional[CompanyResponse]:
         """Update an existing company"""
-        try:
-            collection = await self._get_collection()
-            
-            # Prepare update data
-            update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
-            update_dict["updated_at"] = datetime.utcnow()
-            
-            # Update company
-            result = await collection.update_one(
-                {"_id": ObjectId(company_id)},
-                {"$set": update_dict}
-            )
-            
-            if result.modified_count > 0:
-                # Fetch updated company
-                updated_company = await collection.find_one({"_id": ObjectId(company_id)})
-                logger.info(f"✅ Updated company: {company_id}")
-                
-                return CompanyResponse(
-                    id=str(updated_company["_id"]),
-                    **{k: v for k, v in updated_company.items() if k != "_id"}
-                )
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to update company {company_id}: {e}")
-            return None
-    
+        collection = self._get_collection()
+        
+        # Prepare update data
+        update_dict = update_data.model_dump(exclude_none=True)
+        update_dict["updated_at"] = datetime.utcnow()
+        
+        # Update company and return the updated document in the same round-trip
+        updated_company = await collection.find_one_and_update(
+            {"_id": ObjectId(company_id)},
+            {"$set": update_dict},
+            return_document=ReturnDocument.AFTER
+        )
+        
+        if updated_company:
+            await self._lookup_cache.clear()
+            logger.info("Updated company: %s", company_id)
+            
+            return _to_company_response(updated_company)
+        
+        return None
+    
+    @log_errors("delete_company")
     async def delete_company(self, company_id: str) -> bool:
         """Delete a company"""
-        try:
-            collection = await self._get_collection()
-            result = await collection.delete_one({"_id": ObjectId(company_id)})
-            
-            if result.deleted_count > 0:
-                logger.info(f"✅ Deleted company: {company_id}")
-                return True
-            return False
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to delete company {company_id}: {e}")
-            return False
+        collection = self._get_collection()
+        result = await collection.delete_one({"_id": ObjectId(company_id)})
+        
+        if result.deleted_count > 0:
+            await self._lookup_cache.clear()
+            logger.info("Deleted company: %s", company_id)
+            return True
+        return False
     
     # Duplicate Checking Methods
     
+    @log_errors("find_by_domain")
     async def find_by_domain(self, domain: str) -> Optional[CompanyResponse]:
         """Find company by domain (primary deduplication method)"""
-        try:
-            collection = await self._get_collection()
-            company = await collection.find_one({"domain": domain})
-            
-            if company:
-                logger.info(f"🔍 Found existing company by domain: {domain}")
-                return CompanyResponse(
-                    id=str(company["_id"]),
-                    **{k: v for k, v in company.items() if k != "_id"}
-                )
-            return None
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to find company by domain {domain}: {e}")
-            return None
-    
+        cache_key = f"domain:{domain}"
+        cached = await self._lookup_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        collection = self._get_collection()
+        company = await collection.find_one({"domain": domain})
+        
+        if company:
+            logger.info("Found existing company by domain: %s", domain)
+            response = _to_company_response(company)
+            await self._lookup_cache.set(cache_key, response)
+            return response
+        return None
+    
+    @log_errors("find_by_name")
     async def find_by_name(self, name: str) -> Optional[CompanyResponse]:
         """Find company by name (secondary deduplication method)"""
-        try:
-            collection = await self._get_collection()
-            
-            # Case-insensitive search
-            company = await collection.find_one({"name": {"$regex": f"^{name}$", "$options": "i"}})
-            
-            if company:
-                logger.info(f"🔍 Found existing company by name: {name}")
-                return CompanyResponse(
-                    id=str(company["_id"]),
-                    **{k: v for k, v in company.items() if k != "_id"}
-                )
-            return None
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to find company by name {name}: {e}")
-            return None
-    
+        collection = self._get_collection()
+        
+        # Case-insensitive exact match, served by the collated name index
+        company = await collection.find_one({"name": name}, collation=CASE_INSENSITIVE_COLLATION)
+        
+        if company:
+            logger.info("Found existing company by name: %s", name)
+            return _to_company_response(company)
+        return None
+    
+    @log_errors("find_by_apollo_id")
     async def find_by_apollo_id(self, apollo_id: str) -> Optional[CompanyResponse]:
         """Find company by Apollo ID (API deduplication)"""
-        try:
-            collection = await self._get_collection()
-            company = await collection.find_one({"apollo_id": apollo_id})
-            
-            if company:
-                logger.info(f"🔍 Found existing company by Apollo ID: {apollo_id}")
-                return CompanyResponse(
-                    id=str(company["_id"]),
-                    **{k: v for k, v in company.items() if k != "_id"}
-                )
-            return None
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to find company by Apollo ID {apollo_id}: {e}")
-            return None
+        cache_key = f"apollo_id:{apollo_id}"
+        cached = await self._lookup_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        collection = self._get_collection()
+        company = await collection.find_one({"apollo_id": apollo_id})
+        
+        if company:
+            logger.info("Found existing company by Apollo ID: %s", apollo_id)
+            response = _to_company_response(company)
+            await self._lookup_cache.set(cache_key, response)
+            return response
+        return None
     
     # Advanced Operations
     
+    async def _find_by_unique_keys(self, keys: Dict[str, Optional[str]]) -> Optional[CompanyResponse]:
+        """Find a company by the first matching key (in priority order) with a single $or query"""
+        keys = {field: value for field, value in keys.items() if value}
+        if not keys:
+            return None
+        
+        # Only the highest-priority key can be answered from cache without a DB check
+        field, value = next(iter(keys.items()))
+        cached = await self._lookup_cache.get(f"{field}:{value}")
+        if cached is not None:
+            return cached
+        
+        collection = self._get_collection()
+        cursor = collection.find({"$or": [{field: value} for field, value in keys.items()]}).limit(len(keys))
+        matches = await cursor.to_list(length=len(keys))
+        
+        for field, value in keys.items():
+            for company in matches:
+                if company.get(field) == value:
+                    logger.info("Found existing company by %s: %s", field, value)
+                    response = _to_company_response(company)
+                    await self._lookup_cache.set(f"{field}:{value}", response)
+                    return response
+        return None
+    
+    @log_errors("find_or_create_company")
     async def find_or_create_company(self, company_data: CompanyCreate) -> CompanyResponse:
         """Find existing company or create new one (upsert logic)"""
-        try:
-            # Try to find by domain first
-            if company_data.domain:
-                existing = await self.find_by_domain(company_data.domain)
-                if existing:
-                    logger.info(f"🔄 Using existing company (domain): {existing.name}")
-                    return existing
-            
-            # Try to find by Apollo ID
-            if company_data.apollo_id:
-                existing = await self.find_by_apollo_id(company_data.apollo_id)
-                if existing:
-                    logger.info(f"🔄 Using existing company (Apollo): {existing.name}")
-                    return existing
-            
-            # Try to find by name (fuzzy match)
-            existing = await self.find_by_name(company_data.name)
-            if existing:
-                logger.info(f"🔄 Using existing company (name): {existing.name}")
-                return existing
-            
-            # Create new company
-            logger.info(f"🆕 Creating new company: {company_data.name}")
-            return await self.create_company(company_data)
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to find or create company {company_data.name}: {e}")
-            raise
-    
+        # Domain/Apollo ID and name lookups are independent: run them concurrently
+        by_key, by_name = await asyncio.gather(
+            self._find_by_unique_keys({
+                "domain": company_data.domain,
+                "apollo_id": company_data.apollo_id
+            }),
+            self.find_by_name(company_data.name)
+        )
+        
+        # Domain/Apollo ID take priority over the name match
+        if by_key:
+            logger.info("Using existing company: %s", by_key.name)
+            return by_key
+        if by_name:
+            logger.info("Using existing company (name): %s", by_name.name)
+            return by_name
+        
+        # Create new company
+        logger.info("Creating new company: %s", company_data.name)
+        return await self.create_company(company_data)
+    
+    @log_errors("list_companies")
     async def list_companies(self, skip: int = 0, limit: int = 100) -> List[CompanyResponse]:
         """List companies with pagination"""
-        try:
-            collection = await self._get_collection()
-            cursor = collection.find().skip(skip).limit(limit).sort("created_at", -1)
-            
-            companies = []
-            async for company in cursor:
-                companies.append(CompanyResponse(
-                    id=str(company["_id"]),
-                    **{k: v for k, v in company.items() if k != "_id"}
-                ))
-            
-            return companies
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to list companies: {e}")
-            return []
-    
+        collection = self._get_collection()
+        # Fetch the whole page in one batch instead of awaiting per document
+        cursor = collection.find().sort("created_at", -1).skip(skip).limit(limit).batch_size(limit)
+        companies = await cursor.to_list(length=limit)
+        
+        return [_to_company_response(company) for company in companies]
+    
+    @log_errors("search_companies")
     async def search_companies(self, query: str) -> List[CompanyResponse]:
         """Search companies by name or domain"""
-        try:
-            collection = await self._get_collection()
-            
-            # Text search on name and domain
-            cursor = collection.find({
-                "$or": [
-                    {"name": {"$regex": query, "$options": "i"}},
-                    {"domain": {"$regex": query, "$options": "i"}}
-                ]
-            }).limit(50)
-            
-            companies = []
-            async for company in cursor:
-                companies.append(CompanyResponse(
-                    id=str(company["_id"]),
-                    **{k: v for k, v in company.items() if k != "_id"}
-                ))
-            
-            return companies
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to search companies: {e}")
-            return []
+        collection = self._get_collection()
+        
+        # Match the query literally (user input must not be interpreted as a pattern)
+        pattern = re.escape(query)
+        
+        # Text search on name and domain
+        cursor = collection.find({
+            "$or": [
+                {"name": {"$regex": pattern, "$options": "i"}},
+                {"domain": {"$regex": pattern, "$options": "i"}}
+            ]
+        }).limit(50).batch_size(50)
+        companies = await cursor.to_list(length=50)
+        
+        return [_to_company_response(company) for company in companies]
 
 
 # Global service instance
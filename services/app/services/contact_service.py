@@ -3,228 +3,204 @@ Contact Service
 Handles CRUD operations for contacts with duplicate checking and company relationships
 """
 import logging
+import re
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from bson import ObjectId
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from pymongo.asynchronous.collection import AsyncCollection
 
 from ..config.database import get_database
 from ..config.constants import COLLECTIONS
 from ..models.contact import Contact, ContactCreate, ContactUpdate, ContactResponse, ContactWithCompany
+from ..utils.caching import MemoryCache
+from ..utils.common_utils import log_errors
 
 logger = logging.getLogger(__name__)
 
 
+def _to_contact_response(contact: Dict[str, Any]) -> ContactResponse:
+    """Build a response from a stored contact document without re-validating it"""
+    contact["id"] = str(contact.pop("_id"))
+    contact["company_id"] = str(contact.pop("company_id", ""))
+    return ContactResponse.model_construct(**contact)
+
+
 class ContactService:
     """Service for managing contact data with duplicate checking and company relationships"""
     
     def __init__(self):
-        self.db: Optional[AsyncIOMotorDatabase] = None
         self.collection_name = COLLECTIONS["contacts"]
         self.companies_collection_name = COLLECTIONS["companies"]
+        self._collection: Optional[AsyncCollection] = None
+        self._companies_collection: Optional[AsyncCollection] = None
+        # Short-lived dedup cache: the same email/Apollo ID recurs across enrichment batches
+        self._lookup_cache = MemoryCache(default_ttl=300, max_entries=10_000)
     
-    async def _get_db(self) -> AsyncIOMotorDatabase:
-        """Get database connection"""
-        if self.db is None:
-            self.db = get_database()  # get_database() is not async
-        return self.db
+    def _get_collection(self) -> AsyncCollection:
+        """Get contacts collection (resolved once, on first use)"""
+        if self._collection is None:
+            self._collection = get_database()[self.collection_name]
+        return self._collection
     
-    async def _get_collection(self):
-        """Get contacts collection"""
-        db = await self._get_db()
-        return db[self.collection_name]
-    
-    async def _get_companies_collection(self):
-        """Get companies collection"""
-        db = await self._get_db()
-        return db[self.companies_collection_name]
+    def _get_companies_collection(self) -> AsyncCollection:
+        """Get companies collection (resolved once, on first use)"""
+        if self._companies_collection is None:
+            self._companies_collection = get_database()[self.companies_collection_name]
+        return self._companies_collection
     
     # CRUD Operations
     
+    @log_errors("create_contact")
     async def create_contact(self, contact_data: ContactCreate) -> ContactResponse:
         """Create a new contact"""
-        try:
-            collection = await self._get_collection()
-            
-            # Convert company_id string to ObjectId
-            contact_dict = contact_data.dict()
-            contact_dict["company_id"] = ObjectId(contact_data.company_id)
-            
-            # Convert to Contact model for validation
-            contact = Contact(**contact_dict)
-            
-            # Insert into database
-            result = await collection.insert_one(contact.dict(by_alias=True))
-            
-            # Fetch the created contact
-            created_contact = await collection.find_one({"_id": result.inserted_id})
-            
-            logger.info(f"✅ Created contact: {contact.name} (ID: {result.inserted_id})")
-            
-            return ContactResponse(
-                id=str(created_contact["_id"]),
-                company_id=str(created_contact["company_id"]),
-                **{k: v for k, v in created_contact.items() if k not in ["_id", "company_id"]}
-            )
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to create contact {contact_data.name}: {e}")
-            raise
+        collection = self._get_collection()
+        
+        # Convert company_id string to ObjectId
+        contact_dict = contact_data.model_dump()
+        contact_dict["company_id"] = ObjectId(contact_data.company_id)
+        
+        # Convert to Contact model for validation
+        contact = Contact(**contact_dict)
+        
+        # Insert into database; the inserted document is already complete, so no re-read
+        created_contact = contact.model_dump(by_alias=True)
+        result = await collection.insert_one(created_contact)
+        
+        logger.info("Created contact: %s (ID: %s)", contact.name, result.inserted_id)
+        
+        return _to_contact_response(created_contact)
     
+    @log_errors("get_contact_by_id")
     async def get_contact_by_id(self, contact_id: str) -> Optional[ContactResponse]:
         """Get contact by ID"""
-        try:
-            collection = await self._get_collection()
-            contact = await collection.find_one({"_id": ObjectId(contact_id)})
-            
-            if contact:
-                return ContactResponse(
-                    id=str(contact["_id"]),
-                    company_id=str(contact["company_id"]),
-                    **{k: v for k, v in contact.items() if k not in ["_id", "company_id"]}
-                )
-            return None
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to get contact {contact_id}: {e}")
-            return None
+        collection = self._get_collection()
+        contact = await collection.find_one({"_id": ObjectId(contact_id)})
+        
+        if contact:
+            return _to_contact_response(contact)
+        return None
     
+    @log_errors("get_contact_with_company")
     async def get_contact_with_company(self, contact_id: str) -> Optional[ContactWithCompany]:
         """Get contact with embedded company information"""
-        try:
-            collection = await self._get_collection()
-            companies_collection = await self._get_companies_collection()
-            
-            # Aggregation pipeline to join with companies
-            pipeline = [
-                {"$match": {"_id": ObjectId(contact_id)}},
-                {
-                    "$lookup": {
-                        "from": self.companies_collection_name,
-                        "localField": "company_id",
-                        "foreignField": "_id",
-                        "as": "company"
-                    }
-                },
-                {"$unwind": {"path": "$company", "preserveNullAndEmptyArrays": True}}
-            ]
-            
-            cursor = collection.aggregate(pipeline)
-            result = await cursor.to_list(length=1)
-            
-            if result:
-                contact_data = result[0]
-                company_data = contact_data.get("company")
-                
-                # Format company data
-                company_info = None
-                if company_data:
-                    company_info = {
-                        "id": str(company_data["_id"]),
-                        "name": company_data.get("name"),
-                        "domain": company_data.get("domain"),
-                        "industry": company_data.get("industry")
-                    }
-                
-                return ContactWithCompany(
-                    id=str(contact_data["_id"]),
-                    company_id=str(contact_data["company_id"]),
-                    company=company_info,
-                    **{k: v for k, v in contact_data.items() if k not in ["_id", "company_id", "company"]}
-                )
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to get contact with company {contact_id}: {e}")
-            return None
+        collection = self._get_collection()
+        companies_collection = self._get_companies_collection()
+        
+        # Aggregation pipeline to join with companies, pulling only the fields we return
+        pipeline = [
+            {"$match": {"_id": ObjectId(contact_id)}},
+            {
+                "$lookup": {
+                    "from": self.companies_collection_name,
+                    "let": {"company_id": "$company_id"},
+                    "pipeline": [
+                        {"$match": {"$expr": {"$eq": ["$_id", "$$company_id"]}}},
+                        {"$project": {"name": 1, "domain": 1, "industry": 1}}
+                    ],
+                    "as": "company"
+                }
+            },
+            {"$addFields": {"company": {"$arrayElemAt": ["$company", 0]}}}
+        ]
+        
+        cursor = await collection.aggregate(pipeline)
+        result = await cursor.to_list(length=1)
+        
+        if result:
+            contact_data = result[0]
+            company_data = contact_data.pop("company", None)
+            
+            # Format company data
+            company_info = None
+            if company_data:
+                company_info = {
+                    "id": str(company_data["_id"]),
+                    "name": company_data.get("name"),
+                    "domain": company_data.get("domain"),
+                    "industry": company_data.get("industry")
+                }
+            
+            contact_data["id"] = str(contact_data.pop("_id"))
+            contact_data["company_id"] = str(contact_data.pop("company_id"))
+            return ContactWithCompany.model_construct(company=company_info, **contact_data)
+        
+        return None
     
+    @log_errors("update_contact")
     async def update_contact(self, contact_id: str, update_data: ContactUpdate) -> Optional[ContactResponse]:
         """Update an existing contact"""
-        try:
-            collection = await self._get_collection()
-            
-            # Prepare update data
-            update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
-            update_dict["updated_at"] = datetime.utcnow()
-            
-            # Update contact
-            result = await collection.update_one(
-                {"_id": ObjectId(contact_id)},
-                {"$set": update_dict}
-            )
-            
-            if result.modified_count > 0:
-                # Fetch updated contact
-                updated_contact = await collection.find_one({"_id": ObjectId(contact_id)})
-                logger.info(f"✅ Updated contact: {contact_id}")
-                
-                return ContactResponse(
-                    id=str(updated_contact["_id"]),
-                    company_id=str(updated_contact["company_id"]),
-                    **{k: v for k, v in updated_contact.items() if k not in ["_id", "company_id"]}
-                )
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to update contact {contact_id}: {e}")
-            return None
+        collection = self._get_collection()
+        
+        # Prepare update data
+        update_dict = update_data.model_dump(exclude_none=True)
+        update_dict["updated_at"] = datetime.utcnow()
+        
+        # Update contact and return the updated document in the same round-trip
+        updated_contact = await collection.find_one_and_update(
+            {"_id": ObjectId(contact_id)},
+            {"$set": update_dict},
+            return_document=ReturnDocument.AFTER
+        )
+        
+        if updated_contact:
+            await self._lookup_cache.clear()
+            logger.info("Updated contact: %s", contact_id)
+            
+            return _to_contact_response(updated_contact)
+        
+        return None
     
+    @log_errors("delete_contact")
     async def delete_contact(self, contact_id: str) -> bool:
         """Delete a contact"""
-        try:
-            collection = await self._get_collection()
-            result = await collection.delete_one({"_id": ObjectId(contact_id)})
-            
-            if result.deleted_count > 0:
-                logger.info(f"✅ Deleted contact: {contact_id}")
-                return True
-            return False
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to delete contact {contact_id}: {e}")
-            return False
+        collection = self._get_collection()
+        result = await collection.delete_one({"_id": ObjectId(contact_id)})
+        
+        if result.deleted_count > 0:
+            await self._lookup_cache.clear()
+            logger.info("Deleted contact: %s", contact_id)
+            return True
+        return False
     
     # Duplicate Checking Methods
     
+    @log_errors("find_by_email")
     async def find_by_email(self, email: str) -> Optional[ContactResponse]:
         """Find contact by email (primary deduplication method)"""
-        try:
-            collection = await self._get_collection()
-            contact = await collection.find_one({"email": email})
-            
-            if contact:
-                logger.info(f"🔍 Found existing contact by email: {email}")
-                return ContactResponse(
-                    id=str(contact["_id"]),
-                    company_id=str(contact["company_id"]),
-                    **{k: v for k, v in contact.items() if k not in ["_id", "company_id"]}
-                )
-            return None
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to find contact by email {email}: {e}")
-            return None
+        cache_key = f"email:{email}"
+        cached = await self._lookup_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        collection = self._get_collection()
+        contact = await collection.find_one({"email": email})
+        
+        if contact:
+            logger.info("Found existing contact by email: %s", email)
+            response = _to_contact_response(contact)
+            await self._lookup_cache.set(cache_key, response)
+            return response
+        return None
     
+    @log_errors("find_by_apollo_id")
     async def find_by_apollo_id(self, apollo_id: str) -> Optional[ContactResponse]:
         """Find contact by Apollo ID (API deduplication)"""
-        try:
-            collection = await self._get_collection()
-            contact = await collection.find_one({"apollo_id": apollo_id})
-            
-            if contact:
-                logger.info(f"🔍 Found existing contact by Apollo ID: {apollo_id}")
-                return ContactResponse(
-                    id=str(contact["_id"]),
-                    company_id=str(contact["company_id"]),
-                    **{k: v for k, v in contact.items() if k not in ["_id", "company_id"]}
-                )
-            return None
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to find contact by Apollo ID {apollo_id}: {e}")
-            return None
+        cache_key = f"apollo_id:{apollo_id}"
+        cached = await self._lookup_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        collection = self._get_collection()
+        contact = await collection.find_one({"apollo_id": apollo_id})
+        
+        if contact:
+            logger.info("Found existing contact by Apollo ID: %s", apollo_id)
+            response = _to_contact_response(contact)
+            await self._lookup_cache.set(cache_key, response)
+            return response
+        return None
     
     # async def find_by_snov_id(self, snov_id: str) -> Optional[ContactResponse]:
     #     """Find contact by Snov ID (API deduplication) - REMOVED: Snov.io not implemented"""
@@ -232,107 +208,153 @@ class ContactService:
     
     # Company Relationship Methods
     
-    async def get_contacts_by_company_id(self, company_id: str, skip: int = 0, limit: int = 100) -> List[ContactResponse]:
-        """Get all contacts for a specific company"""
-        try:
-            collection = await self._get_collection()
-            cursor = collection.find({"company_id": ObjectId(company_id)}).skip(skip).limit(limit).sort("created_at", -1)
-            
-            contacts = []
-            async for contact in cursor:
-                contacts.append(ContactResponse(
-                    id=str(contact["_id"]),
-                    company_id=str(contact["company_id"]),
-                    **{k: v for k, v in contact.items() if k not in ["_id", "company_id"]}
-                ))
-            
-            return contacts
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to get contacts for company {company_id}: {e}")
-            return []
+    @log_errors("get_contacts_by_company_id")
+    async def get_contacts_by_company_id(
+        self,
+        company_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[ContactResponse] = None
+    ) -> List[ContactResponse]:
+        """Get all contacts for a specific company; pass the last contact of a page as after to fetch the next one"""
+        collection = self._get_collection()
+        query: Dict[str, Any] = {"company_id": ObjectId(company_id)}
+        
+        # Keyset pagination seeks straight to the next page on the (company_id, created_at, _id) index,
+        # where skip would walk every earlier entry
+        if after is not None:
+            after_id = ObjectId(after.id)
+            query["$or"] = [
+                {"created_at": {"$lt": after.created_at}},
+                {"created_at": after.created_at, "_id": {"$lt": after_id}}
+            ]
+            skip = 0
+        
+        # Fetch the whole page in one batch instead of awaiting per document
+        cursor = collection.find(query).sort([("created_at", -1), ("_id", -1)]).skip(skip).limit(limit).batch_size(limit)
+        contacts = await cursor.to_list(length=limit)
+        
+        return [_to_contact_response(contact) for contact in contacts]
     
+    async def _find_by_unique_keys(self, keys: Dict[str, Optional[str]]) -> Optional[ContactResponse]:
+        """Find a contact by the first matching key (in priority order) with a single $or query"""
+        keys = {field: value for field, value in keys.items() if value}
+        if not keys:
+            return None
+        
+        # Only the highest-priority key can be answered from cache without a DB check
+        field, value = next(iter(keys.items()))
+        cached = await self._lookup_cache.get(f"{field}:{value}")
+        if cached is not None:
+            return cached
+        
+        collection = self._get_collection()
+        cursor = collection.find({"$or": [{field: value} for field, value in keys.items()]}).limit(len(keys))
+        matches = await cursor.to_list(length=len(keys))
+        
+        for field, value in keys.items():
+            for contact in matches:
+                if contact.get(field) == value:
+                    logger.info("Found existing contact by %s: %s", field, value)
+                    response = _to_contact_response(contact)
+                    await self._lookup_cache.set(f"{field}:{value}", response)
+                    return response
+        return None
+    
+    @log_errors("find_or_create_contact")
     async def find_or_create_contact(self, contact_data: ContactCreate) -> ContactResponse:
         """Find existing contact or create new one (upsert logic)"""
-        try:
-            # Try to find by email first
-            existing = await self.find_by_email(contact_data.email)
-            if existing:
-                logger.info(f"🔄 Using existing contact (email): {existing.name}")
-                return existing
-            
-            # Try to find by Apollo ID
-            if contact_data.apollo_id:
-                existing = await self.find_by_apollo_id(contact_data.apollo_id)
-                if existing:
-                    logger.info(f"🔄 Using existing contact (Apollo): {existing.name}")
-                    return existing
-            
-            # # Try to find by Snov ID - REMOVED: Snov.io not implemented
-            # if contact_data.snov_id:
-            #     existing = await self.find_by_snov_id(contact_data.snov_id)
-            #     if existing:
-            #         logger.info(f"🔄 Using existing contact (Snov): {existing.name}")
-            #         return existing
-            
-            # Create new contact
-            logger.info(f"🆕 Creating new contact: {contact_data.name}")
-            return await self.create_contact(contact_data)
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to find or create contact {contact_data.name}: {e}")
-            raise
+        # Try email, then Apollo ID (both indexed, resolved in one query)
+        existing = await self._find_by_unique_keys({
+            "email": contact_data.email,
+            "apollo_id": contact_data.apollo_id
+        })
+        if existing:
+            logger.info("Using existing contact: %s", existing.name)
+            return existing
+        
+        # # Try to find by Snov ID - REMOVED: Snov.io not implemented
+        # if contact_data.snov_id:
+        #     existing = await self.find_by_snov_id(contact_data.snov_id)
+        #     if existing:
+        #         logger.info("Using existing contact (Snov): %s", existing.name)
+        #         return existing
+        
+        # Create new contact
+        logger.info("Creating new contact: %s", contact_data.name)
+        return await self.create_contact(contact_data)
+    
+    @log_errors("find_or_create_contacts_bulk")
+    async def find_or_create_contacts_bulk(self, contacts_data: List[ContactCreate]) -> List[ContactResponse]:
+        """Find or create many contacts with a single upsert round-trip keyed on email"""
+        collection = self._get_collection()
+        
+        # One insert-only upsert per distinct email
+        docs_by_email: Dict[str, Dict[str, Any]] = {}
+        for contact_data in contacts_data:
+            if contact_data.email not in docs_by_email:
+                contact_dict = contact_data.model_dump()
+                contact_dict["company_id"] = ObjectId(contact_data.company_id)
+                docs_by_email[contact_data.email] = Contact(**contact_dict).model_dump(by_alias=True)
+        
+        found: Dict[str, ContactResponse] = {}
+        if docs_by_email:
+            operations = [
+                UpdateOne({"email": email}, {"$setOnInsert": doc}, upsert=True)
+                for email, doc in docs_by_email.items()
+            ]
+            try:
+                await collection.bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                # Conflicts on other unique keys (e.g. apollo_id) fall back to the per-item path below
+                logger.warning("Bulk contact upsert skipped %s conflicting contacts", len(e.details.get("writeErrors", [])))
+            
+            cursor = collection.find({"email": {"$in": list(docs_by_email)}})
+            for contact in await cursor.to_list(length=None):
+                found[contact["email"]] = _to_contact_response(contact)
+        
+        # Preserve input order; contacts that conflicted use find_or_create_contact
+        contacts = []
+        for contact_data in contacts_data:
+            contacts.append(found.get(contact_data.email) or await self.find_or_create_contact(contact_data))
+        
+        logger.info("Found or created %s contacts in bulk", len(contacts))
+        return contacts
     
+    @log_errors("search_contacts")
     async def search_contacts(self, query: str, company_id: Optional[str] = None) -> List[ContactResponse]:
         """Search contacts by name or email"""
-        try:
-            collection = await self._get_collection()
-            
-            # Build search filter
-            search_filter = {
-                "$or": [
-                    {"name": {"$regex": query, "$options": "i"}},
-                    {"email": {"$regex": query, "$options": "i"}}
-                ]
-            }
-            
-            # Add company filter if specified
-            if company_id:
-                search_filter["company_id"] = ObjectId(company_id)
-            
-            cursor = collection.find(search_filter).limit(50)
-            
-            contacts = []
-            async for contact in cursor:
-                contacts.append(ContactResponse(
-                    id=str(contact["_id"]),
-                    company_id=str(contact["company_id"]),
-                    **{k: v for k, v in contact.items() if k not in ["_id", "company_id"]}
-                ))
-            
-            return contacts
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to search contacts: {e}")
-            return []
+        collection = self._get_collection()
+        
+        # Match the query literally (user input must not be interpreted as a pattern)
+        pattern = re.escape(query)
+        
+        # Build search filter
+        search_filter = {
+            "$or": [
+                {"name": {"$regex": pattern, "$options": "i"}},
+                {"email": {"$regex": pattern, "$options": "i"}}
+            ]
+        }
+        
+        # Add company filter if specified
+        if company_id:
+            search_filter["company_id"] = ObjectId(company_id)
+        
+        cursor = collection.find(search_filter).limit(50).batch_size(50)
+        contacts = await cursor.to_list(length=50)
+        
+        return [_to_contact_response(contact) for contact in contacts]
     
+    @log_errors("get_all_contacts")
     async def get_all_contacts(self, limit: int = 50, skip: int = 0) -> List[ContactResponse]:
         """Fetch all contacts (simple pagination)"""
-        try:
-            collection = await self._get_collection()
-            cursor = collection.find({}).sort("created_at", -1).skip(skip).limit(limit)
-            results: List[ContactResponse] = []
-            async for doc in cursor:
-                results.append(ContactResponse(
-                    id=str(doc["_id"]),
-                    company_id=str(doc.get("company_id", "")),  # Use .get() with a default
-                    **{k: v for k, v in doc.items() if k not in ["_id", "company_id"]}
-                ))
+        collection = self._get_collection()
+        # Fetch the whole page in one batch instead of awaiting per document
+        cursor = collection.find({}).sort("created_at", -1).skip(skip).limit(limit).batch_size(limit)
+        docs = await cursor.to_list(length=limit)
 
-            return results
-        except Exception as e:
-            logger.error(f"❌ Failed to get_all_contacts: {e}")
-            return []
+        return [_to_contact_response(doc) for doc in docs]
 
 
 # Global service instance
@@ -3,102 +3,316 @@ Enrichment Service
 Handles company and contact enrichment using Apollo.io API with proper data storage
 Uses separate companies and contacts collections for better data management
 """
+import asyncio
+import bisect
+import hashlib
 import logging
 import aiohttp
+import orjson
 import os
+import random
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
 from typing import Optional, Dict, Any, List, Tuple
-from datetime import datetime
 from dotenv import load_dotenv
 
 from .company_service import company_service
 from .contact_service import contact_service
-from ..models.company import CompanyCreate, CompanyResponse
-from ..models.contact import ContactCreate, ContactResponse
+from ..models.company import CompanyCreate
+from ..models.contact import ContactCreate
+from ..utils.caching import MemoryCache
+from ..utils.parallel_processing import CircuitBreaker
 
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 APOLLO_API_KEY = os.getenv("APOLLO_API_KEY")
+APOLLO_ENABLED = bool(APOLLO_API_KEY)
+APOLLO_MAX_RETRIES = int(os.getenv("APOLLO_MAX_RETRIES", "3"))
+# Longest single backoff, even when Apollo's Retry-After asks for more (e.g. an hour on quota exhaustion)
+APOLLO_MAX_RETRY_DELAY = float(os.getenv("APOLLO_MAX_RETRY_DELAY", "30"))
+APOLLO_BREAKER_FAILURE_THRESHOLD = int(os.getenv("APOLLO_BREAKER_FAILURE_THRESHOLD", "5"))
+APOLLO_BREAKER_RECOVERY_SECONDS = float(os.getenv("APOLLO_BREAKER_RECOVERY_SECONDS", "30"))
+
+# Request constants shared by every Apollo call
+_APOLLO_BASE_URL = "https://api.apollo.io"
+_APOLLO_ORG_SEARCH_URL = f"{_APOLLO_BASE_URL}/v1/organizations/search"
+_APOLLO_PEOPLE_SEARCH_URL = f"{_APOLLO_BASE_URL}/v1/people/search"
+_APOLLO_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Built once at import and passed to every Apollo POST
+_APOLLO_HEADERS = {
+    "X-Api-Key": APOLLO_API_KEY or "",
+    "Content-Type": "application/json",
+    "Cache-Control": "no-cache"
+}
+# Titles of the people we want to reach at a hiring company
+PERSON_TITLES: Tuple[str, ...] = ("recruiter", "hr", "talent", "hiring", "people", "ceo", "founder")
+_BASE_PEOPLE_PAYLOAD = {
+    "page": 1,
+    "per_page": 5,  # Reduced to avoid rate limits
+    "person_titles": PERSON_TITLES
+}
+
+# Connection pool sizing for Apollo calls; match to the Apollo plan's rate limits
+APOLLO_MAX_CONNECTIONS = int(os.getenv("APOLLO_MAX_CONNECTIONS", "64"))
+APOLLO_MAX_CONNECTIONS_PER_HOST = int(os.getenv("APOLLO_MAX_CONNECTIONS_PER_HOST", "16"))
+# Apollo requests allowed in flight at once, across all callers of the service
+APOLLO_MAX_CONCURRENCY = int(os.getenv("APOLLO_MAX_CONCURRENCY", "16"))
+
+# Apollo answers are stable for a day (company profiles for a week); "not found" is cached briefly so bad names don't re-hit the API every job
+APOLLO_CACHE_TTL = int(os.getenv("APOLLO_CACHE_TTL", "86400"))
+APOLLO_COMPANY_CACHE_TTL = int(os.getenv("APOLLO_COMPANY_CACHE_TTL", "604800"))
+APOLLO_NEGATIVE_CACHE_TTL = int(os.getenv("APOLLO_NEGATIVE_CACHE_TTL", "600"))
+
+# Upper bounds (exclusive) of each company size range, and one label per range plus the open-ended top one
+_COMPANY_SIZE_BOUNDS = (10, 50, 200, 1000, 5000)
+_COMPANY_SIZE_LABELS = (
+    "1-10 employees",
+    "11-50 employees",
+    "51-200 employees",
+    "201-1000 employees",
+    "1001-5000 employees",
+    "5000+ employees"
+)
+
+_NAME_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_NON_DOMAIN_CHARS_RE = re.compile(r"[^a-z0-9]")
+# Fallback company classes by keyword found anywhere in the name; branches are tried in order, so
+# "State University" is education. Each branch matches empty at the start and names its class via lastgroup
+_FALLBACK_CLASS_RE = re.compile(
+    r"(?=.*?(?:university|college|school))(?P<edu>)"
+    r"|(?=.*?(?:gov|federal|state))(?P<gov>)"
+    r"|(?=.*?(?:nonprofit|foundation|charity))(?P<org>)",
+    re.DOTALL
+)
+# (top-level domain, industry, size) per class
+_FALLBACK_CLASSES = {
+    "edu": ("edu", "Education", "1000-5000"),
+    "gov": ("gov", "Government", "5000+"),
+    "org": ("org", "Non-profit", "100-500")
+}
+_DEFAULT_FALLBACK_CLASS = ("com", "Technology", "100-1000")
+# Apollo keywords too generic to describe what a company does (matched anywhere in the keyword)
+_GENERIC_KEYWORDS_RE = re.compile(r"b2b|b2c|e-commerce|services|solutions", re.IGNORECASE)
+
+
+def _parse_retry_after(value: str) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP-date form), or None if absent/invalid"""
+    value = value.strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        # HTTP dates are always GMT
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+@lru_cache(maxsize=4096)
+def _normalize_company_name(company_name: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so "Acme, Inc." and "acme  inc" match"""
+    return " ".join(_NAME_PUNCTUATION_RE.sub("", company_name.lower()).split())
+
+
+@lru_cache(maxsize=4096)
+def _format_company_size(employee_count: Optional[int]) -> str:
+    """Format employee count into size ranges"""
+    if not employee_count:
+        return "Unknown"
+    return _COMPANY_SIZE_LABELS[bisect.bisect_right(_COMPANY_SIZE_BOUNDS, employee_count)]
+
+
+@lru_cache(maxsize=4096)
+def _classify_fallback_company(name_lower: str) -> Tuple[str, str, str]:
+    """Guess (top-level domain, industry, size) for a company Apollo doesn't know, from its lowercased name"""
+    match = _FALLBACK_CLASS_RE.match(name_lower)
+    return _FALLBACK_CLASSES[match.lastgroup] if match else _DEFAULT_FALLBACK_CLASS
 
 
 class EnrichmentService:
     """Enrichment service with companies and contacts collections"""
     
-    def __init__(self):
-        self._session: Optional[aiohttp.ClientSession] = None
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        self._session = session
+        # Sessions passed in by the caller are theirs to close
+        self._owns_session = session is None
+        # Apollo search results keyed by request; entries wrap the result so a cached "not found" differs from a cache miss
+        self._apollo_cache = MemoryCache(default_ttl=APOLLO_CACHE_TTL, max_entries=10_000)
+        self._inflight_company_searches: Dict[str, asyncio.Future] = {}
+        self._apollo_semaphore = asyncio.Semaphore(APOLLO_MAX_CONCURRENCY)
+        # During an Apollo outage, skip straight to fallback data instead of paying timeouts and retries per company
+        self._apollo_breaker = CircuitBreaker(
+            failure_threshold=APOLLO_BREAKER_FAILURE_THRESHOLD,
+            recovery_timeout=APOLLO_BREAKER_RECOVERY_SECONDS
+        )
     
     async def get_session(self) -> aiohttp.ClientSession:
         """Get or create HTTP session"""
         if not self._session or self._session.closed:
+            # Keep-alive pool with cached DNS so repeated Apollo calls skip the TCP/TLS handshake
+            connector = aiohttp.TCPConnector(
+                limit=APOLLO_MAX_CONNECTIONS,
+                limit_per_host=APOLLO_MAX_CONNECTIONS_PER_HOST,
+                ttl_dns_cache=300,
+                keepalive_timeout=75,
+                enable_cleanup_closed=True
+            )
             self._session = aiohttp.ClientSession(
+                connector=connector,
                 timeout=aiohttp.ClientTimeout(total=30),
-                headers={"User-Agent": "AI-Recruitment-Agent/1.0"}
+                headers={"User-Agent": "AI-Recruitment-Agent/1.0"},
+                # Apollo is stateless; don't parse or store cookies
+                cookie_jar=aiohttp.DummyCookieJar()
             )
+            self._owns_session = True
         return self._session
     
+    async def warm_up(self):
+        """Create the session and open a keep-alive connection to Apollo so the first search skips DNS and TLS setup"""
+        session = await self.get_session()
+        if not APOLLO_ENABLED:
+            logger.warning("⚠️ APOLLO_API_KEY is not set; companies will be enriched with fallback data")
+            return
+        try:
+            # HEAD on the API host costs no credits; the connection goes back to the pool afterwards
+            async with session.head(_APOLLO_BASE_URL):
+                pass
+            logger.info("✅ Apollo HTTP session warmed up")
+        except Exception as e:
+            logger.warning("⚠️ Apollo warm-up failed: %s", e)
+    
     async def close_session(self):
         """Close HTTP session"""
-        if self._session and not self._session.closed:
+        if self._owns_session and self._session and not self._session.closed:
             await self._session.close()
     
+    async def _apollo_post(self, url: str, payload: Dict[str, Any]) -> Optional[Tuple[int, bytes]]:
+        """POST to Apollo, retrying rate limits (429), transient 5xx and network errors with jittered exponential backoff
+        Returns the status and the body (at most 512 bytes of it for non-200 responses),
+        or None without calling Apollo while the circuit breaker is open"""
+        if not self._apollo_breaker.allow_request():
+            logger.debug("Apollo circuit open, skipping request to %s", url)
+            return None
+        
+        session = await self.get_session()
+        # Serialize once (also across retries); _APOLLO_HEADERS already declares the JSON content type
+        data = orjson.dumps(payload)
+        for attempt in range(APOLLO_MAX_RETRIES + 1):
+            last_attempt = attempt == APOLLO_MAX_RETRIES
+            try:
+                # Only the request itself holds a slot, not the backoff sleep below
+                async with self._apollo_semaphore, session.post(url, data=data, headers=_APOLLO_HEADERS) as response:
+                    if response.status not in _APOLLO_RETRY_STATUSES or last_attempt:
+                        # Error bodies are only logged: read a bounded snippet (e.g. of an HTML 502 page)
+                        body = await response.read() if response.status == 200 else await response.content.read(512)
+                        if response.status in _APOLLO_RETRY_STATUSES:
+                            self._apollo_breaker.record_failure()
+                        else:
+                            self._apollo_breaker.record_success()
+                        return response.status, body
+                    retry_after = response.headers.get("Retry-After", "")
+                    reason = f"status {response.status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if last_attempt:
+                    self._apollo_breaker.record_failure()
+                    raise
+                retry_after, reason = "", repr(e)
+            
+            # Honor Retry-After (seconds or HTTP-date) when Apollo sends it, otherwise back off with full jitter;
+            # capped so one throttled response can't stall a whole enrichment run
+            delay = _parse_retry_after(retry_after)
+            if delay is None:
+                delay = random.uniform(0, 0.5 * 2 ** attempt)
+            delay = min(delay, APOLLO_MAX_RETRY_DELAY)
+            logger.warning(
+                "⚠️ Apollo request failed (%s), retrying in %.1fs (%s/%s)", reason, delay, attempt + 1, APOLLO_MAX_RETRIES,
+                extra={"url": url, "attempt": attempt + 1}
+            )
+            await asyncio.sleep(delay)
+    
     # Company Enrichment Methods
     
     async def _apollo_company_search(self, company_name: str) -> Optional[Dict[str, Any]]:
         """Search for company using Apollo.io API"""
-        if not APOLLO_API_KEY or not company_name:
-            logger.warning(f"⚠️ Missing Apollo API key or company name")
+        # A missing API key is reported once at startup (warm_up), not per company
+        if not APOLLO_ENABLED or not company_name:
             return None
 
+        # Spelling variants of one company share a cache entry (and an in-flight search)
+        normalized_name = _normalize_company_name(company_name)
+        cache_key = "apollo:org:v1:" + hashlib.blake2b(normalized_name.encode(), digest_size=16).hexdigest()
+        cached = await self._apollo_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Apollo company search cache_hit: %s", company_name)
+            return cached["result"]
+        logger.debug("Apollo company search cache_miss: %s", company_name)
+
+        # Singleflight: concurrent searches for the same name share one Apollo request
+        search = self._inflight_company_searches.get(cache_key)
+        if search is None:
+            search = asyncio.ensure_future(self._fetch_apollo_company(company_name, cache_key))
+            self._inflight_company_searches[cache_key] = search
+            search.add_done_callback(lambda _: self._inflight_company_searches.pop(cache_key, None))
+        # Shielded so one cancelled caller doesn't cancel the search for the others
+        return await asyncio.shield(search)
+
+    async def _fetch_apollo_company(self, company_name: str, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Run the Apollo organization search and cache its answer"""
         try:
-            session = await self.get_session()
-            url = "https://api.apollo.io/v1/organizations/search"
-            headers = {
-                "X-Api-Key": APOLLO_API_KEY,
-                "Content-Type": "application/json",
-                "Cache-Control": "no-cache"
-            }
             payload = {
                 "q_organization_name": company_name,
                 "page": 1,
                 "per_page": 1
             }
 
-            async with session.post(url, json=payload, headers=headers) as response:
-                response_text = await response.text()
-
-                if response.status == 200:
-                    data = await response.json()
-                    orgs = data.get("organizations", [])
-
-                    if orgs:
-                        org = orgs[0]
-                        logger.info(f"✅ Found company in Apollo: {org.get('name', company_name)}")
-
-                        # Create description from available data since Apollo free plan doesn't provide descriptions
-                        description = self._create_company_description(org)
-
-                        return {
-                            "name": org.get("name", company_name),
-                            "domain": org.get("primary_domain"),
-                            "website": org.get("website_url"),
-                            "industry": org.get("industry"),
-                            "size": self._format_company_size(org.get("estimated_num_employees")),
-                            "headquarters": f"{org.get('city', '')}, {org.get('state', '')}, {org.get('country', '')}".strip(", "),
-                            "description": description,
-                            "apollo_id": str(org.get("id"))
-                        }
-                    else:
-                        logger.warning(f"⚠️ No company found in Apollo for: {company_name}")
-                elif response.status == 401:
-                    logger.error(f" Apollo API authentication failed - check API key")
-                elif response.status == 422:
-                    logger.error(f" Apollo API insufficient credits: {response_text}")
+            response = await self._apollo_post(_APOLLO_ORG_SEARCH_URL, payload)
+            if response is None:
+                # Apollo is failing; don't cache anything, the caller falls back
+                return None
+            status, body = response
+            if status == 200:
+                data = orjson.loads(body)
+                orgs = data.get("organizations", [])
+
+                if orgs:
+                    org = orgs[0]
+                    logger.debug("Found company in Apollo: %s", org.get("name", company_name))
+
+                    # Create description from available data since Apollo free plan doesn't provide descriptions
+                    description = self._create_company_description(org)
+
+                    result = {
+                        "name": org.get("name", company_name),
+                        "domain": org.get("primary_domain"),
+                        "website": org.get("website_url"),
+                        "industry": org.get("industry"),
+                        "size": _format_company_size(org.get("estimated_num_employees")),
+                        "headquarters": ", ".join(part for part in (org.get("city"), org.get("state"), org.get("country")) if part),
+                        "description": description,
+                        "apollo_id": str(org.get("id"))
+                    }
+                    await self._apollo_cache.set(cache_key, {"result": result}, ttl=APOLLO_COMPANY_CACHE_TTL)
+                    return result
                 else:
-                    logger.error(f" Apollo API error {response.status}: {response_text}")
+                    logger.warning("⚠️ No company found in Apollo for: %s", company_name, extra={"company": company_name})
+                    await self._apollo_cache.set(cache_key, {"result": None}, ttl=APOLLO_NEGATIVE_CACHE_TTL)
+            elif status == 401:
+                logger.error("❌ Apollo API authentication failed - check API key", extra={"status": status})
+            elif status == 422:
+                logger.error("❌ Apollo API insufficient credits: %s", body.decode("utf-8", "replace"), extra={"status": status})
+            else:
+                logger.error("❌ Apollo API error %s: %s", status, body.decode("utf-8", "replace"), extra={"status": status})
 
         except Exception as e:
-            logger.error(f" Apollo company search failed for {company_name}: {e}")
+            logger.error("❌ Apollo company search failed for %s: %s", company_name, e, extra={"company": company_name})
 
         return None
 
@@ -115,7 +329,7 @@ class EnrichmentService:
             # Add employee count
             employees = org.get("estimated_num_employees")
             if employees:
-                size_desc = self._format_company_size(employees)
+                size_desc = _format_company_size(employees)
                 if size_desc:
                     description_parts.append(f"with {size_desc.lower()}")
 
@@ -141,110 +355,90 @@ class EnrichmentService:
             keywords = org.get("keywords", [])
             if keywords and len(keywords) > 0:
                 # Filter out generic terms and take top business-relevant keywords
-                business_keywords = [kw for kw in keywords[:10] if len(kw) > 3 and
-                                   not any(generic in kw.lower() for generic in ['b2b', 'b2c', 'e-commerce', 'services', 'solutions'])]
+                business_keywords = [kw for kw in keywords[:10] if len(kw) > 3 and not _GENERIC_KEYWORDS_RE.search(kw)]
                 if business_keywords:
                     top_keywords = business_keywords[:5]
                     description_parts.append(f"specializing in {', '.join(top_keywords)}")
 
-            if description_parts:
-                description = ". ".join(description_parts) + "."
-                # Capitalize first letter
-                return description[0].upper() + description[1:] if description else None
+            if not description_parts:
+                return None
 
-            return None
+            # Capitalize the first fragment (e.g. "with 11-50 employees") rather than re-slicing the joined text
+            first_part = description_parts[0]
+            description_parts[0] = first_part[:1].upper() + first_part[1:]
+            return ". ".join(description_parts) + "."
 
         except Exception as e:
-            logger.warning(f"Failed to create company description: {e}")
+            logger.warning("Failed to create company description: %s", e)
             return None
 
     async def _apollo_people_search(self, company_id: str, company_domain: Optional[str] = None) -> List[Dict[str, Any]]:
         """Search for people at a company using Apollo.io API"""
-        if not APOLLO_API_KEY:
-            logger.warning(f"⚠️ Missing Apollo API key for people search")
+        if not APOLLO_ENABLED:
             return []
 
-        try:
-            session = await self.get_session()
-            url = "https://api.apollo.io/v1/people/search"
-            headers = {
-                "X-Api-Key": APOLLO_API_KEY,
-                "Content-Type": "application/json",
-                "Cache-Control": "no-cache"
-            }
+        cache_key = "apollo:people:" + hashlib.sha1(f"{company_id}|{company_domain}".encode()).hexdigest()
+        cached = await self._apollo_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Apollo people search cache_hit: %s", company_id)
+            return cached["result"]
+        logger.debug("Apollo people search cache_miss: %s", company_id)
 
+        try:
             # Build search payload
-            payload = {
-                "page": 1,
-                "per_page": 5,  # Reduced to avoid rate limits
-                "organization_ids": [company_id] if company_id else None,
-                "person_titles": ["recruiter", "hr", "talent", "hiring", "people", "ceo", "founder"]
-            }
+            payload = {**_BASE_PEOPLE_PAYLOAD, "organization_ids": [company_id] if company_id else None}
 
             # Add domain filter if available
             if company_domain:
                 payload["email_domain"] = company_domain
 
-            logger.info(f"🔍 Searching Apollo for contacts at company: {company_id}")
-            logger.debug(f"🔧 People search payload: {payload}")
-
-            async with session.post(url, json=payload, headers=headers) as response:
-                response_text = await response.text()
-                logger.debug(f"🔧 People API response status: {response.status}")
-
-                if response.status == 200:
-                    data = await response.json()
-                    people = data.get("people", [])
-
-                    contacts = []
-                    for person in people:
-                        contact_data = {
-                            "name": f"{person.get('first_name', '')} {person.get('last_name', '')}".strip(),
-                            "email": person.get("email"),
-                            "title": person.get("title"),
-                            "phone": person.get("phone"),
-                            "linkedin_url": person.get("linkedin_url"),
-                            "department": person.get("department"),
-                            "seniority": person.get("seniority"),
-                            "apollo_id": str(person.get("id"))
-                        }
-
-                        # Only add if we have essential data
-                        if contact_data["name"] and contact_data["email"]:
-                            contacts.append(contact_data)
-
-                    logger.info(f"✅ Found {len(contacts)} contacts in Apollo")
-                    return contacts
-                elif response.status == 401:
-                    logger.error(f"❌ Apollo People API authentication failed")
-                elif response.status == 422:
-                    logger.error(f"❌ Apollo People API insufficient credits: {response_text}")
-                else:
-                    logger.error(f"❌ Apollo people API error {response.status}: {response_text}")
+            logger.debug("Searching Apollo for contacts at company: %s", company_id)
+            logger.debug("People search payload: %s", payload)
+
+            response = await self._apollo_post(_APOLLO_PEOPLE_SEARCH_URL, payload)
+            if response is None:
+                return []
+            status, body = response
+            logger.debug("People API response status: %s", status)
+
+            if status == 200:
+                data = orjson.loads(body)
+                people = data.get("people", [])
+
+                contacts = []
+                for person in people:
+                    contact_data = {
+                        "name": f"{person.get('first_name', '')} {person.get('last_name', '')}".strip(),
+                        "email": person.get("email"),
+                        "title": person.get("title"),
+                        "phone": person.get("phone"),
+                        "linkedin_url": person.get("linkedin_url"),
+                        "department": person.get("department"),
+                        "seniority": person.get("seniority"),
+                        "apollo_id": str(person.get("id"))
+                    }
+
+                    # Only add if we have essential data
+                    if contact_data["name"] and contact_data["email"]:
+                        contacts.append(contact_data)
+
+                logger.debug("Found %s contacts in Apollo", len(contacts))
+                await self._apollo_cache.set(
+                    cache_key, {"result": contacts}, ttl=APOLLO_CACHE_TTL if contacts else APOLLO_NEGATIVE_CACHE_TTL
+                )
+                return contacts
+            elif status == 401:
+                logger.error("❌ Apollo People API authentication failed", extra={"status": status})
+            elif status == 422:
+                logger.error("❌ Apollo People API insufficient credits: %s", body.decode("utf-8", "replace"), extra={"status": status})
+            else:
+                logger.error("❌ Apollo people API error %s: %s", status, body.decode("utf-8", "replace"), extra={"status": status})
 
         except Exception as e:
-            logger.error(f"❌ Apollo people search failed: {e}")
+            logger.error("❌ Apollo people search failed: %s", e, extra={"company_id": company_id})
 
         return []
     
-    def _format_company_size(self, employee_count: Optional[int]) -> str:
-        """Format employee count into size ranges"""
-        if not employee_count:
-            return "Unknown"
-        
-        if employee_count < 10:
-            return "1-10 employees"
-        elif employee_count < 50:
-            return "11-50 employees"
-        elif employee_count < 200:
-            return "51-200 employees"
-        elif employee_count < 1000:
-            return "201-1000 employees"
-        elif employee_count < 5000:
-            return "1001-5000 employees"
-        else:
-            return "5000+ employees"
-    
     # Main Enrichment Methods
     
     async def enrich_company_and_contacts(self, company_name: str) -> Dict[str, Any]:
@@ -253,42 +447,40 @@ class EnrichmentService:
         Returns: {company_id: str, contacts_count: int, enrichment_source: str}
         """
         try:
-            logger.info(f" Starting enrichment for: {company_name}")
+            logger.info("Starting enrichment for: %s", company_name)
             
-            # Step 1: Enrich company data
-            company_result = await self._enrich_company(company_name)
+            # Step 1: Enrich company data (Apollo, or fallback data when Apollo has no match)
+            apollo_data = await self._apollo_company_search(company_name)
             
-            if not company_result["success"]:
-                logger.warning(f"⚠️ Company enrichment failed for: {company_name}")
-                return {
-                    "company_id": None,
-                    "contacts_count": 0,
-                    "enrichment_source": "failed",
-                    "error": company_result.get("error")
-                }
+            if apollo_data:
+                company_create = CompanyCreate(**apollo_data, enrichment_source="apollo")
+            else:
+                logger.warning("⚠️ No Apollo data found for %s", company_name, extra={"company": company_name})
+                logger.debug("Using fallback enrichment for: %s", company_name)
+                company_create = CompanyCreate(**self._generate_fallback_company_data(company_name), enrichment_source="fallback")
             
-            company_id = company_result["company_id"]
-            company_data = company_result["company_data"]
+            # Find or create company (handles deduplication)
+            company = await company_service.find_or_create_company(company_create)
             
             # Step 2: Skip contact enrichment for now (requires paid Apollo plan)
             contacts_count = 0
-            logger.info(f"⚠️ Skipping contact enrichment for {company_name} (requires paid Apollo plan)")
+            logger.debug("Skipping contact enrichment for %s (requires paid Apollo plan)", company_name)
             
-            logger.info(f"✅ Enrichment complete: {company_name} (Company ID: {company_id}, Contacts: {contacts_count})")
+            logger.info("Enrichment complete: %s (Company ID: %s, Contacts: %s)", company_name, company.id, contacts_count)
             
             return {
-                "company_id": company_id,
+                "company_id": company.id,
                 "contacts_count": contacts_count,
-                "enrichment_source": company_data.enrichment_source,
+                "enrichment_source": company.enrichment_source,
                 "company_data": {
-                    "name": company_data.name,
-                    "domain": company_data.domain,
-                    "industry": company_data.industry
+                    "name": company.name,
+                    "domain": company.domain,
+                    "industry": company.industry
                 }
             }
             
         except Exception as e:
-            logger.error(f"❌ Enrichment failed for {company_name}: {e}")
+            logger.error("❌ Enrichment failed for %s: %s", company_name, e, extra={"company": company_name})
             return {
                 "company_id": None,
                 "contacts_count": 0,
@@ -296,105 +488,31 @@ class EnrichmentService:
                 "error": str(e)
             }
     
-    async def _enrich_company(self, company_name: str) -> Dict[str, Any]:
-        """Enrich and store company data using Apollo API only"""
-        try:
-            # Try Apollo enrichment
-            apollo_data = await self._apollo_company_search(company_name)
-
-            if apollo_data:
-                # Create company with Apollo data
-                company_create = CompanyCreate(
-                    name=apollo_data["name"],
-                    domain=apollo_data["domain"],
-                    website=apollo_data["website"],
-                    industry=apollo_data["industry"],
-                    size=apollo_data["size"],
-                    headquarters=apollo_data["headquarters"],
-                    description=apollo_data["description"],
-                    apollo_id=apollo_data["apollo_id"],
-                    enrichment_source="apollo"
-                )
-
-                # Find or create company (handles deduplication)
-                company = await company_service.find_or_create_company(company_create)
-
-                return {
-                    "success": True,
-                    "company_id": company.id,
-                    "company_data": company
-                }
-            else:
-                # No Apollo data found - use fallback enrichment
-                logger.warning(f"⚠️ No Apollo data found for {company_name}")
-                logger.info(f"🔄 Using fallback enrichment for: {company_name}")
-
-                # Generate fallback company data
-                fallback_data = self._generate_fallback_company_data(company_name)
-
-                company_create = CompanyCreate(
-                    name=fallback_data["name"],
-                    domain=fallback_data["domain"],
-                    website=fallback_data["website"],
-                    industry=fallback_data["industry"],
-                    size=fallback_data["size"],
-                    headquarters=fallback_data["headquarters"],
-                    description=fallback_data["description"],
-                    apollo_id=None,
-                    enrichment_source="fallback"
-                )
-
-                # Find or create company (handles deduplication)
-                company = await company_service.find_or_create_company(company_create)
-
-                logger.info(f"✅ Created fallback company: {company_name}")
-
-                return {
-                    "success": True,
-                    "company_id": company.id,
-                    "company_data": company
-                }
-
-        except Exception as e:
-            logger.error(f"❌ Company enrichment failed for {company_name}: {e}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
-    
     async def _enrich_contacts(self, company_id: str, apollo_company_id: str, company_domain: str) -> Dict[str, Any]:
         """Enrich and store contact data for a company"""
         try:
             # Search for contacts using Apollo
             apollo_contacts = await self._apollo_people_search(apollo_company_id, company_domain)
             
-            contacts_created = 0
+            contact_creates = []
             for contact_data in apollo_contacts:
                 try:
-                    # Create contact
-                    contact_create = ContactCreate(
-                        name=contact_data["name"],
-                        email=contact_data["email"],
-                        title=contact_data["title"],
+                    # _apollo_people_search already returns ContactCreate field names
+                    contact_creates.append(ContactCreate(
+                        **contact_data,
                         company_id=company_id,
-                        phone=contact_data["phone"],
-                        linkedin_url=contact_data["linkedin_url"],
-                        department=contact_data["department"],
-                        seniority=contact_data["seniority"],
-                        apollo_id=contact_data["apollo_id"],
                         enrichment_source="apollo",
                         confidence_score=0.9  # High confidence for Apollo data
-                    )
-                    
-                    # Find or create contact (handles deduplication)
-                    contact = await contact_service.find_or_create_contact(contact_create)
-                    contacts_created += 1
-                    
+                    ))
                 except Exception as e:
-                    logger.warning(f"⚠️ Failed to create contact {contact_data.get('name', 'Unknown')}: {e}")
+                    logger.warning("⚠️ Failed to create contact %s: %s", contact_data.get("name", "Unknown"), e, extra={"company_id": company_id})
                     continue
             
-            logger.info(f"✅ Created/found {contacts_created} contacts for company {company_id}")
+            # Find or create all contacts in one round-trip (handles deduplication)
+            contacts = await contact_service.find_or_create_contacts_bulk(contact_creates) if contact_creates else []
+            contacts_created = len(contacts)
+            
+            logger.debug("Created/found %s contacts for company %s", contacts_created, company_id)
             
             return {
                 "success": True,
@@ -402,7 +520,7 @@ class EnrichmentService:
             }
             
         except Exception as e:
-            logger.error(f" Contact enrichment failed for company {company_id}: {e}")
+            logger.error("❌ Contact enrichment failed for company %s: %s", company_id, e, extra={"company_id": company_id})
             return {
                 "success": False,
                 "contacts_count": 0,
@@ -412,30 +530,11 @@ class EnrichmentService:
     def _generate_fallback_company_data(self, company_name: str) -> Dict[str, Any]:
         """Generate fallback company data when Apollo API doesn't have information"""
 
-        # Generate a basic domain from company name
-        domain_name = company_name.lower().replace(" ", "").replace(".", "").replace(",", "")
-        domain_name = ''.join(c for c in domain_name if c.isalnum())
-
-        # Common domain extensions for different company types
-        if any(word in company_name.lower() for word in ["university", "college", "school"]):
-            domain = f"{domain_name}.edu"
-            industry = "Education"
-            size = "1000-5000"
-        elif any(word in company_name.lower() for word in ["government", "gov", "federal", "state"]):
-            domain = f"{domain_name}.gov"
-            industry = "Government"
-            size = "5000+"
-        elif any(word in company_name.lower() for word in ["nonprofit", "foundation", "charity"]):
-            domain = f"{domain_name}.org"
-            industry = "Non-profit"
-            size = "100-500"
-        else:
-            domain = f"{domain_name}.com"
-            industry = "Technology"  # Default industry
-            size = "100-1000"  # Default size
-
-        # Generate basic description
-        description = f"{company_name} is a company in the {industry.lower()} industry."
+        name_lower = company_name.lower()
+
+        # Basic domain from the company name, with the extension matching the company type
+        tld, industry, size = _classify_fallback_company(name_lower)
+        domain = f"{_NON_DOMAIN_CHARS_RE.sub('', name_lower)}.{tld}"
 
         return {
             "name": company_name,
@@ -444,7 +543,7 @@ class EnrichmentService:
             "industry": industry,
             "size": size,
             "headquarters": "Unknown",
-            "description": description
+            "description": f"{company_name} is a company in the {industry.lower()} industry."
         }
 
 
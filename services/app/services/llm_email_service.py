@@ -4,25 +4,122 @@ Generates personalized, professional outreach emails using Google Gemini (Free)
 """
 
 import os
+import hashlib
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import json
 from datetime import datetime, timezone
 from dotenv import load_dotenv
 import asyncio
+from functools import lru_cache
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+
+from ..config.workflow_config import WorkflowConfig
+from ..utils.caching import MemoryCache
+from ..utils.parallel_processing import RateLimiter
 
 # Gemini imports (Primary and Only LLM)
 try:
     import google.generativeai as genai
+    from google.api_core.exceptions import ResourceExhausted
     GEMINI_AVAILABLE = True
 except ImportError:
     GEMINI_AVAILABLE = False
     genai = None
+    ResourceExhausted = None
     logging.warning("Google Generative AI not installed. Install with: pip install google-generativeai")
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Company descriptions come from enrichment and can run to several paragraphs; the email needs a sentence or two
+MAX_COMPANY_DESCRIPTION_CHARS = 500
+
+# Email prompt pieces are static; only the tone/type lines vary, and each combination is assembled once
+_BASE_SYSTEM_PROMPT = """
+You are an expert recruitment copywriter specializing in candidate presentation emails to hiring managers.
+Generate professional, concise recruitment emails that:
+
+1. Present a specific candidate by name to a hiring manager
+2. Are extremely concise (under 150 words, 3-4 short paragraphs max)
+3. Lead with value proposition (qualified candidate for their specific role)
+4. Include relevant candidate qualifications matching job requirements
+5. Use professional, confident tone without being pushy
+6. Include clear call-to-action (request for interview/discussion)
+7. Follow standard business email formatting
+8. Sound authentic and human-written (not AI-generated)
+
+Critical requirements:
+- MUST mention the candidate by name (given under Candidate Information)
+- Focus on the candidate's fit for THIS specific role
+
+Return response as JSON with these fields:
+{
+    "subject": "Concise subject line with candidate name and role",
+    "body_html": "HTML formatted email body (under 150 words)",
+    "body_text": "Plain text version",
+    "call_to_action": "Main CTA text",
+    "personalization_elements": ["candidate_name", "job_title", "company_name", "key_skills"]
+}
+"""
+
+_TONE_ADJUSTMENTS = {
+    "professional_warm": "Use warm but professional language. Be approachable yet credible.",
+    "professional_formal": "Use formal business language. Be direct and authoritative.",
+    "casual_friendly": "Use friendly, conversational tone. Be personable and relatable."
+}
+
+_EMAIL_TYPE_ADJUSTMENTS = {
+    "candidate_presentation": "Focus on presenting the candidate as an ideal fit for the specific role.",
+    "talent_partnership": "Focus on long-term partnership and mutual value creation.",
+    "cold_outreach": "Focus on immediate value and credibility building.",
+    "warm_intro": "Reference mutual connections or previous interactions."
+}
+
+
+@lru_cache(maxsize=32)
+def _system_prompt(email_type: str, tone: str) -> str:
+    """Build the system prompt for an email type and tone"""
+    return f"""{_BASE_SYSTEM_PROMPT}
+**Email Type:** {email_type}
+**Tone:** {tone}
+**Tone Adjustment:** {_TONE_ADJUSTMENTS.get(tone, '')}
+**Email Type Focus:** {_EMAIL_TYPE_ADJUSTMENTS.get(email_type, '')}
+"""
+
+
+@lru_cache(maxsize=256)
+def _fallback_email_text(
+    recruiter_name: Optional[str],
+    candidate_name: str,
+    candidate_experience: str,
+    candidate_skills: str,
+    job_title: str,
+    company_name: str
+) -> Tuple[str, str, str]:
+    """Render the fallback email's subject, HTML and plain-text body (reused when the LLM is down for a batch)"""
+    subject = f"Qualified Candidate: {candidate_name} for {job_title} at {company_name}"
+
+    body_html = f"""
+    <p>Hi {recruiter_name or 'there'},</p>
+
+    <p>I'm Shaoni Dutta, and I'd like to present <strong>{candidate_name}</strong> for your <strong>{job_title}</strong> position.
+    Through our AI matching system, they scored as an excellent fit for your requirements.</p>
+
+    <p><strong>{candidate_name}</strong> brings {candidate_experience} with expertise in {candidate_skills},
+    directly aligning with the technical needs outlined in your job posting.</p>
+
+    <p>Would you be available for a brief call to discuss {candidate_name}'s qualifications and potential fit for your team?</p>
+
+    <p>Best regards,<br>
+    <strong>Shaoni Dutta</strong><br>
+    AI Recruitment Specialist</p>
+    """
+    body_text = body_html.replace('<p>', '').replace('</p>', '\n').replace('<strong>', '').replace('</strong>', '').replace('<br>', '\n')
+
+    return subject, body_html, body_text
+
+
 class LLMEmailService:
     """Service for generating personalized recruitment emails using Google Gemini (Free)"""
 
@@ -31,6 +128,13 @@ class LLMEmailService:
         self.gemini_api_key = os.getenv("GOOGLE_API_KEY")
         self.gemini_model = os.getenv("GEMINI_MODEL", "gemini-flash-latest")
 
+        # Caps in-flight Gemini requests when several emails are generated concurrently
+        self._semaphore = asyncio.Semaphore(int(os.getenv("GEMINI_MAX_CONCURRENCY", "10")))
+        # Paces requests to the Gemini quota across all concurrent callers
+        self._rate_limiter = RateLimiter(WorkflowConfig.GEMINI_RATE_LIMIT_PER_MINUTE)
+        # Identical prompts (same job, candidate, type and tone) reuse the generated email
+        self._response_cache = MemoryCache(default_ttl=3600, max_entries=5000)
+
         # Configure Gemini
         if self.gemini_api_key and GEMINI_AVAILABLE and genai:
             try:
@@ -79,7 +183,8 @@ class LLMEmailService:
         matched_candidate: Optional[Dict[str, Any]] = None,
         email_type: str = "candidate_presentation",
         tone: str = "professional_warm",
-        recruiter_name: Optional[str] = None
+        recruiter_name: Optional[str] = None,
+        context: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate personalized outreach email using LLM with candidate information
@@ -91,6 +196,7 @@ class LLMEmailService:
             email_type: Type of email (candidate_presentation, talent_partnership, cold_outreach)
             tone: Email tone (professional_warm, professional_formal, casual_friendly)
             recruiter_name: Recruiter's name if known
+            context: Prebuilt _build_email_context output, when generating several emails for the same inputs
 
         Returns:
             Dict with generated email content, subject, and metadata
@@ -101,9 +207,8 @@ class LLMEmailService:
                 return self._generate_fallback_email(job_details, company_info, "Hiring Manager", matched_candidate)
 
             # Build context for Gemini with candidate information
-            context = self._build_email_context(
-                job_details, company_info, matched_candidate, email_type, tone, recruiter_name
-            )
+            if context is None:
+                context = self._build_email_context(job_details, company_info, matched_candidate, recruiter_name)
 
             # Generate email using Gemini
             response = await self._generate_with_gemini(context, email_type, tone)
@@ -144,31 +249,36 @@ class LLMEmailService:
             if not self.gemini_client:
                 raise ValueError("Gemini client not initialized")
 
-            # Create generation config (simplified)
+            # Create generation config (simplified); JSON mode keeps the reply parseable without markdown fences
             generation_config = {
                 'temperature': 0.7,
                 'max_output_tokens': 800,
+                'response_mime_type': 'application/json',
             }
 
+            prompt_hash = hashlib.blake2b(full_prompt.encode(), digest_size=16).hexdigest()
+            cache_key = f"{self.gemini_model}:{generation_config['temperature']}:{generation_config['max_output_tokens']}:{prompt_hash}"
+            cached = await self._response_cache.get(cache_key)
+            if cached is not None:
+                logger.info("♻️ Reusing cached Gemini email")
+                return dict(cached)  # Callers add metadata to the returned dict
+
             # Try to generate content with error handling
             try:
-                response = await asyncio.to_thread(
-                    self.gemini_client.generate_content,
-                    full_prompt,
-                    generation_config=generation_config
-                )
+                response = await self._call_gemini(full_prompt, generation_config=generation_config)
             except Exception as api_error:
+                if ResourceExhausted is not None and isinstance(api_error, ResourceExhausted):
+                    # _call_gemini already spent its quota retries; another cycle without the config won't help
+                    raise
                 logger.error(f"❌ Gemini API call failed: {api_error}")
                 # Try without generation config
                 logger.info("🔄 Retrying without generation config...")
-                response = await asyncio.to_thread(
-                    self.gemini_client.generate_content,
-                    full_prompt
-                )
+                response = await self._call_gemini(full_prompt)
 
             # Parse JSON response
             email_data = json.loads(response.text)
             logger.info(f"✅ Gemini generated email successfully")
+            await self._response_cache.set(cache_key, dict(email_data))
             return email_data
 
         except json.JSONDecodeError as e:
@@ -179,13 +289,25 @@ class LLMEmailService:
             logger.error(f"❌ Gemini generation failed: {e}")
             raise
 
+    async def _call_gemini(self, prompt: str, **kwargs):
+        """Call Gemini within the shared rate limit, backing off and retrying on quota errors (429)"""
+        async for attempt in AsyncRetrying(
+            retry=retry_if_exception_type(ResourceExhausted),
+            stop=stop_after_attempt(5),
+            wait=wait_random_exponential(min=1, max=60),
+            reraise=True
+        ):
+            with attempt:
+                await self._rate_limiter.acquire()
+                # Only the request holds a concurrency slot, not the rate-limit wait or the backoff between attempts
+                async with self._semaphore:
+                    return await self.gemini_client.generate_content_async(prompt, **kwargs)
+
     def _build_email_context(
         self,
         job_details: Dict[str, Any],
         company_info: Dict[str, Any],
         matched_candidate: Optional[Dict[str, Any]],
-        email_type: str,
-        tone: str,
         recruiter_name: Optional[str]
     ) -> str:
         """Build context string for LLM email generation with candidate personalization"""
@@ -202,9 +324,11 @@ class LLMEmailService:
             candidate_experience = f"{matched_candidate.get('candidate_experience', 0)} years"
             candidate_score = matched_candidate.get('score', 0.0)
 
-        context = f"""
-        Generate a concise, professional recruitment email presenting a specific candidate to a hiring manager.
+        company_description = (company_info.get('description') or 'Innovative technology company')[:MAX_COMPANY_DESCRIPTION_CHARS]
 
+        # Only per-email details go here; the shared instructions live in the system prompt so the
+        # prompt prefix stays identical across calls and can be served from Gemini's prompt cache
+        context = f"""
         **Job Information:**
         - Title: {job_details.get('title', 'Software Engineer')}
         - Company: {company_info.get('name', 'Tech Company')}
@@ -215,7 +339,7 @@ class LLMEmailService:
         **Company Information:**
         - Industry: {company_info.get('industry', 'Technology')}
         - Size: {company_info.get('employee_count', 'Growing startup')} employees
-        - Description: {company_info.get('description', 'Innovative technology company')}
+        - Description: {company_description}
 
         **Candidate Information:**
         - Name: {candidate_name}
@@ -224,71 +348,17 @@ class LLMEmailService:
         - Match Score: {candidate_score:.1%} alignment with your requirements
 
         **Email Parameters:**
-        - Type: {email_type}
-        - Tone: {tone}
         - Recruiter Name: {recruiter_name or '[Hiring Manager]'}
 
         **Context:**
         I am Shaoni Dutta, an AI recruitment specialist. I've identified {candidate_name} as an excellent match for your {job_details.get('title', 'position')} role through our AI-powered matching system.
-
-        **Critical Requirements:**
-        1. MUST mention the candidate by name ({candidate_name})
-        2. Keep email under 150 words (3-4 short paragraphs max)
-        3. Lead with value proposition (qualified candidate for their specific role)
-        4. Include relevant qualifications that match job requirements
-        5. Professional, confident tone without being pushy
-        6. Clear call-to-action (request for interview/discussion)
-        7. Standard business email formatting
-        8. Focus on candidate's fit for THIS specific role
         """
         
         return context
     
     def _get_system_prompt(self, email_type: str, tone: str) -> str:
         """Get system prompt based on email type and tone"""
-
-        base_prompt = """
-        You are an expert recruitment copywriter specializing in candidate presentation emails to hiring managers.
-        Generate professional, concise recruitment emails that:
-
-        1. Present a specific candidate by name to a hiring manager
-        2. Are extremely concise (under 150 words, 3-4 short paragraphs max)
-        3. Lead with value proposition (qualified candidate for their specific role)
-        4. Include relevant candidate qualifications matching job requirements
-        5. Use professional, confident tone without being pushy
-        6. Include clear call-to-action (request for interview/discussion)
-        7. Follow standard business email formatting
-        8. Sound authentic and human-written (not AI-generated)
-
-        Return response as JSON with these fields:
-        {
-            "subject": "Concise subject line with candidate name and role",
-            "body_html": "HTML formatted email body (under 150 words)",
-            "body_text": "Plain text version",
-            "call_to_action": "Main CTA text",
-            "personalization_elements": ["candidate_name", "job_title", "company_name", "key_skills"]
-        }
-        """
-
-        tone_adjustments = {
-            "professional_warm": "Use warm but professional language. Be approachable yet credible.",
-            "professional_formal": "Use formal business language. Be direct and authoritative.",
-            "casual_friendly": "Use friendly, conversational tone. Be personable and relatable."
-        }
-
-        email_type_adjustments = {
-            "candidate_presentation": "Focus on presenting the candidate as an ideal fit for the specific role.",
-            "talent_partnership": "Focus on long-term partnership and mutual value creation.",
-            "cold_outreach": "Focus on immediate value and credibility building.",
-            "warm_intro": "Reference mutual connections or previous interactions."
-        }
-        
-        return f"""
-        {base_prompt}
-        
-        **Tone Adjustment:** {tone_adjustments.get(tone, '')}
-        **Email Type Focus:** {email_type_adjustments.get(email_type, '')}
-        """
+        return _system_prompt(email_type, tone)
     
     def _generate_fallback_email(
         self,
@@ -314,28 +384,14 @@ class LLMEmailService:
             exp_years = matched_candidate.get('candidate_experience', 0)
             candidate_experience = f"{exp_years} years of experience" if exp_years else "appropriate experience"
 
-        subject = f"Qualified Candidate: {candidate_name} for {job_title} at {company_name}"
-
-        body_html = f"""
-        <p>Hi {recruiter_name or 'there'},</p>
-
-        <p>I'm Shaoni Dutta, and I'd like to present <strong>{candidate_name}</strong> for your <strong>{job_title}</strong> position.
-        Through our AI matching system, they scored as an excellent fit for your requirements.</p>
-
-        <p><strong>{candidate_name}</strong> brings {candidate_experience} with expertise in {candidate_skills},
-        directly aligning with the technical needs outlined in your job posting.</p>
-
-        <p>Would you be available for a brief call to discuss {candidate_name}'s qualifications and potential fit for your team?</p>
-
-        <p>Best regards,<br>
-        <strong>Shaoni Dutta</strong><br>
-        AI Recruitment Specialist</p>
-        """
+        subject, body_html, body_text = _fallback_email_text(
+            recruiter_name, candidate_name, candidate_experience, candidate_skills, job_title, company_name
+        )
 
         return {
             "subject": subject,
             "body_html": body_html,
-            "body_text": body_html.replace('<p>', '').replace('</p>', '\n').replace('<strong>', '').replace('</strong>', '').replace('<br>', '\n'),
+            "body_text": body_text,
             "call_to_action": "Schedule a call to discuss the candidate",
             "personalization_elements": [candidate_name, company_name, job_title, candidate_skills],
             "generated_at": datetime.now(timezone.utc).isoformat(),
@@ -352,25 +408,44 @@ class LLMEmailService:
     ) -> List[Dict[str, Any]]:
         """Generate multiple email variants for A/B testing"""
         
-        variants = []
         email_types = ["talent_partnership", "cold_outreach", "warm_intro"]
         tones = ["professional_warm", "professional_formal", "casual_friendly"]
         
-        for i in range(variant_count):
-            email_type = email_types[i % len(email_types)]
-            tone = tones[i % len(tones)]
-            
-            variant = await self.generate_personalized_outreach_email(
+        # Type and tone only change the system prompt, so every variant shares one context
+        context = self._build_email_context(job_details, company_info, None, None)
+        
+        # Variants are independent: generate them concurrently (bounded by the service semaphore)
+        variants = await asyncio.gather(*(
+            self.generate_personalized_outreach_email(
                 job_details=job_details,
                 company_info=company_info,
-                email_type=email_type,
-                tone=tone
+                email_type=email_types[i % len(email_types)],
+                tone=tones[i % len(tones)],
+                context=context
             )
-            
+            for i in range(variant_count)
+        ))
+        
+        for i, variant in enumerate(variants):
             variant["variant_id"] = f"variant_{i+1}"
-            variants.append(variant)
         
-        return variants
+        return list(variants)
+
+    async def generate_batch(self, email_requests: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Generate many emails concurrently (e.g. one per job/candidate pair in a campaign)
+
+        Args:
+            email_requests: Keyword arguments for generate_personalized_outreach_email, one dict per email
+
+        Returns:
+            Generated emails in request order; a request that raised yields its exception instead
+        """
+        # All requests share the service semaphore and rate limiter, so large batches stay within the Gemini quota
+        return await asyncio.gather(
+            *(self.generate_personalized_outreach_email(**email_request) for email_request in email_requests),
+            return_exceptions=True
+        )
 
 # Global service instance
 llm_email_service = LLMEmailService()
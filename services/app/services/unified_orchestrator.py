@@ -355,48 +355,58 @@ class UnifiedOrchestrator:
             llm_generated = 0
             email_details = []
 
-            # Send outreach email for each matched job (limit to 3 for demo)
+            # Collect the jobs to email (limit to 3 for demo)
+            outreach_jobs = []
             for job in matched_jobs[:3]:  # Limit to first 3 jobs for demo
+                # Get job details
+                job_title = job.get("title", "Software Engineer")
+                company_name = job.get("company", "Tech Company")
+
+                # Get matched candidates for this job
+                matches = job.get("matches", [])
+                if not matches:
+                    logger.info(f"No matches for {job_title} at {company_name}, skipping email")
+                    continue
+
+                outreach_jobs.append((job, job_title, company_name, matches[0]))  # Matches are already sorted by score
+
+            def build_email_request(job, job_title, company_name, top_candidate):
+                # Get company data if available
+                company_data = job.get("company_data") or {}
+                company_info = {
+                    "name": company_name,
+                    "industry": company_data.get("industry", "Technology"),
+                    "description": company_data.get("description", "Innovative technology company"),
+                    "employee_count": company_data.get("employee_count", "Growing startup"),
+                    "recent_news": "Expanding their engineering team"  # Demo data
+                }
+
+                # Generate LLM-powered personalized email with candidate information
+                logger.info(f"🤖 Generating personalized email for {top_candidate.get('candidate_name')} → {job_title} at {company_name}")
+
+                return {
+                    "job_details": {
+                        "title": job_title,
+                        "location": job.get("location", "Remote/Hybrid"),
+                        "technical_skills": job.get("technical_skills", ["Python", "React", "AWS"]),
+                        "experience_years_required": job.get("experience_years_required", "3-5")
+                    },
+                    "company_info": company_info,
+                    "matched_candidate": top_candidate,  # NEW: Pass candidate information
+                    "email_type": "candidate_presentation",  # NEW: Changed to candidate presentation
+                    "tone": "professional_warm",
+                    "recruiter_name": "Hiring Manager"
+                }
+
+            # LLM round-trips are independent per job: generate all emails as one batch, then send in order
+            llm_emails = await llm_email_service.generate_batch(
+                [build_email_request(*outreach_job) for outreach_job in outreach_jobs]
+            )
+
+            for (job, job_title, company_name, top_candidate), llm_email in zip(outreach_jobs, llm_emails):
                 try:
-                    # Get job details
-                    job_title = job.get("title", "Software Engineer")
-                    company_name = job.get("company", "Tech Company")
-
-                    # Get company data if available
-                    company_data = job.get("company_data", {})
-                    company_info = {
-                        "name": company_name,
-                        "industry": company_data.get("industry", "Technology"),
-                        "description": company_data.get("description", "Innovative technology company"),
-                        "employee_count": company_data.get("employee_count", "Growing startup"),
-                        "recent_news": "Expanding their engineering team"  # Demo data
-                    }
-
-                    # Get matched candidates for this job
-                    matches = job.get("matches", [])
-                    if not matches:
-                        logger.info(f"No matches for {job_title} at {company_name}, skipping email")
-                        continue
-
-                    # Use the top candidate for personalized email
-                    top_candidate = matches[0]  # Matches are already sorted by score
-
-                    # Generate LLM-powered personalized email with candidate information
-                    logger.info(f"🤖 Generating personalized email for {top_candidate.get('candidate_name')} → {job_title} at {company_name}")
-
-                    llm_email = await llm_email_service.generate_personalized_outreach_email(
-                        job_details={
-                            "title": job_title,
-                            "location": job.get("location", "Remote/Hybrid"),
-                            "technical_skills": job.get("technical_skills", ["Python", "React", "AWS"]),
-                            "experience_years_required": job.get("experience_years_required", "3-5")
-                        },
-                        company_info=company_info,
-                        matched_candidate=top_candidate,  # NEW: Pass candidate information
-                        email_type="candidate_presentation",  # NEW: Changed to candidate presentation
-                        tone="professional_warm",
-                        recruiter_name="Hiring Manager"
-                    )
+                    if isinstance(llm_email, Exception):
+                        raise llm_email
 
                     if llm_email and llm_email.get("subject") and llm_email.get("body_html"):
                         llm_generated += 1
@@ -19,9 +19,10 @@ logger = logging.getLogger(__name__)
 class MemoryCache:
     """High-performance in-memory cache with TTL support"""
     
-    def __init__(self, default_ttl: int = 3600):  # 1 hour default
+    def __init__(self, default_ttl: int = 3600, max_entries: Optional[int] = None):  # 1 hour default
         self.cache: Dict[str, Dict[str, Any]] = {}
         self.default_ttl = default_ttl
+        self.max_entries = max_entries  # None = unbounded
         self._lock = asyncio.Lock()
     
     def _generate_key(self, prefix: str, data: Any) -> str:
@@ -54,6 +55,10 @@ class MemoryCache:
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """Set value in cache"""
         async with self._lock:
+            if self.max_entries and key not in self.cache and len(self.cache) >= self.max_entries:
+                # Evict the oldest entry (dicts keep insertion order)
+                del self.cache[next(iter(self.cache))]
+            
             expires_at = time.time() + (ttl or self.default_ttl)
             self.cache[key] = {
                 'value': value,
@@ -103,8 +108,9 @@ class MemoryCache:
 class CompanyEnrichmentCache:
     """Specialized cache for company enrichment data"""
     
-    def __init__(self, ttl: int = 86400):  # 24 hours for company data
-        self.cache = MemoryCache(default_ttl=ttl)
+    def __init__(self, ttl: int = 86400, max_entries: int = 4096):  # 24 hours for company data
+        # Bounded so a long-running worker doesn't grow one entry per company name forever
+        self.cache = MemoryCache(default_ttl=ttl, max_entries=max_entries)
     
     async def get_company_data(self, company_name: str) -> Optional[Dict[str, Any]]:
         """Get cached company enrichment data"""
@@ -211,6 +217,18 @@ cache_manager = CacheManager()
 def cached_company_enrichment(ttl: Optional[int] = None):
     """Decorator for caching company enrichment results"""
     def decorator(func: Callable[..., Awaitable[Dict[str, Any]]]):
+        # Enrichments in progress, so concurrent misses for one company share a single call
+        inflight: Dict[str, asyncio.Future] = {}
+        
+        async def fetch_and_cache(company_name: str, *args, **kwargs) -> Dict[str, Any]:
+            result = await func(company_name, *args, **kwargs)
+            
+            # Cache the result if successful
+            if result and result.get("company_id"):
+                await cache_manager.company_cache.set_company_data(company_name, result)
+            
+            return result
+        
         @wraps(func)
         async def wrapper(company_name: str, *args, **kwargs) -> Dict[str, Any]:
             # Try cache first
@@ -219,15 +237,16 @@ def cached_company_enrichment(ttl: Optional[int] = None):
                 logger.info(f"Cache HIT for company: {company_name}")
                 return cached_result
             
-            # Cache miss - call original function
-            logger.info(f"Cache MISS for company: {company_name}")
-            result = await func(company_name, *args, **kwargs)
-            
-            # Cache the result if successful
-            if result and result.get("company_id"):
-                await cache_manager.company_cache.set_company_data(company_name, result)
-            
-            return result
+            # Cache miss - call original function, unless the same company is already being enriched
+            key = company_name.lower().strip()
+            call = inflight.get(key)
+            if call is None:
+                logger.info(f"Cache MISS for company: {company_name}")
+                call = asyncio.ensure_future(fetch_and_cache(company_name, *args, **kwargs))
+                inflight[key] = call
+                call.add_done_callback(lambda _: inflight.pop(key, None))
+            # Shielded so one cancelled caller doesn't cancel the enrichment for the others
+            return await asyncio.shield(call)
         
         return wrapper
     return decorator
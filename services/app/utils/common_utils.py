@@ -1,8 +1,13 @@
 # app/services/common/utils.py
 
+import functools
+import logging
+
 import httpx
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
+logger = logging.getLogger(__name__)
+
 
 @retry(
     retry=retry_if_exception_type(httpx.HTTPError),
@@ -42,3 +47,42 @@ def chunk_list(data: list, size: int):
     """
     for i in range(0, len(data), size):
         yield data[i : i + size]
+
+
+def _log_key(value) -> str:
+    """Short description of a call's key argument for log lines (an id, a model's name, a batch size)."""
+    if isinstance(value, (list, tuple)):
+        return f"{len(value)} items"
+    for attr in ("email", "name"):
+        key = getattr(value, attr, None)
+        if key:
+            return str(key)
+    return repr(value)
+
+
+def log_errors(name: str):
+    """
+    Log a service method's failure with its traceback and key argument, then re-raise.
+    The exception is logged once: outer decorated calls it propagates through don't log it again.
+
+    Args:
+        name: Operation name used in the log line.
+
+    Example:
+        >>> @log_errors("create_company")
+        ... async def create_company(self, company_data): ...
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                if not getattr(e, "_error_logged", False):
+                    # First argument after self (or the first keyword argument) identifies the call
+                    key = args[1] if len(args) > 1 else next(iter(kwargs.values()), None)
+                    logger.exception("%s(%s) failed", name, _log_key(key))
+                    e._error_logged = True
+                raise
+        return wrapper
+    return decorator
@@ -182,6 +182,56 @@ class AsyncBatchProcessor:
         return results
 
 
+class RateLimiter:
+    """Token-bucket limiter shared by all callers of a rate-limited API"""
+    
+    def __init__(self, max_per_minute: int):
+        self.capacity = max_per_minute
+        self.tokens = float(max_per_minute)
+        self.refill_per_second = max_per_minute / 60.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a request may be sent; waiters are served in arrival order"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_per_second)
+                self._updated = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self.tokens) / self.refill_per_second)
+
+
+class CircuitBreaker:
+    """Stops calling a failing dependency for a cooldown window after consecutive failures"""
+    
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+    
+    def allow_request(self) -> bool:
+        """False while open; once the cooldown has passed, calls go through again and one failure reopens it"""
+        return self._opened_at is None or time.monotonic() - self._opened_at >= self.recovery_timeout
+    
+    def record_success(self):
+        self.failures = 0
+        self._opened_at = None
+    
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            if self._opened_at is None:
+                logger.warning(f"Circuit opened after {self.failures} consecutive failures")
+            self._opened_at = time.monotonic()
+
+
 # Global instances
 parallel_processor = ParallelProcessor(max_workers=20)
 batch_processor = AsyncBatchProcessor(max_concurrent=15)
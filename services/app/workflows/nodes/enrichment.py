@@ -6,9 +6,9 @@ Optimized with parallel processing and caching for production performance
 import logging
 import traceback
 import asyncio
-from typing import Dict, Any
+from typing import Dict, Any, List
 from ...services.enrichment_service import enrichment_service
-from ...utils.parallel_processing import parallel_processor, performance_monitor
+from ...utils.parallel_processing import performance_monitor
 from ...utils.caching import cache_manager, cached_company_enrichment
 logger = logging.getLogger(__name__)
 
@@ -17,38 +17,54 @@ async def get_cached_company_enrichment(company_name: str) -> Dict[str, Any]:
     """Get company enrichment with caching"""
     return await enrichment_service.enrich_company_and_contacts(company_name)
 
-async def enrich_single_job(job: Dict[str, Any]) -> Dict[str, Any]:
-    """Enrich a single job with company data - optimized with caching and parallel processing"""
+# Companies enriched at once; each enrichment is an Apollo search plus a company find-or-create
+MAX_CONCURRENT_ENRICHMENTS = 16
+
+async def enrich_companies(company_names: List[str]) -> Dict[str, Any]:
+    """Enrich each distinct company once, concurrently
+    Returns {company_name: enrichment result, or the exception its enrichment raised}"""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_ENRICHMENTS)
+
+    async def enrich_one(company_name: str) -> Any:
+        # Returned rather than raised, so one failed company doesn't cancel the rest of the group
+        try:
+            async with semaphore:
+                return await get_cached_company_enrichment(company_name)
+        except Exception as e:
+            return e
+
+    # The same employer often appears on many jobs
+    async with asyncio.TaskGroup() as group:
+        tasks = {name: group.create_task(enrich_one(name)) for name in dict.fromkeys(company_names) if name}
+    return {name: task.result() for name, task in tasks.items()}
+
+def apply_enrichment(job: Dict[str, Any], enrichment_result: Any) -> Dict[str, Any]:
+    """Link a job to its company's enrichment result (or record why enrichment failed)"""
     company_name = job.get("company")
     if not company_name:
         return job
 
-    try:
-        # Use cached enrichment service for production performance
-        enrichment_result = await get_cached_company_enrichment(company_name)
-
-        if enrichment_result["company_id"]:
-            # Success - link job to company
-            job["company_id"] = enrichment_result["company_id"]
-            job["company_data"] = enrichment_result["company_data"]
-            job["enrichment_success"] = True
-            job["contacts_count"] = enrichment_result["contacts_count"]
-
-            # Check if company was enriched via Apollo
-            company_data = enrichment_result.get("company_data")
-            if company_data and hasattr(company_data, 'enrichment_source') and company_data.enrichment_source == "apollo":
-                job["apollo_enriched"] = True
-        else:
-            job["enrichment_success"] = False
-
-    except asyncio.TimeoutError:
+    if isinstance(enrichment_result, asyncio.TimeoutError):
         logger.warning(f"Enrichment timeout for company: {company_name}")
         job["enrichment_success"] = False
         job["enrichment_error"] = "timeout"
-    except Exception as e:
-        logger.error(f"Enrichment failed for {company_name}: {e}")
+    elif isinstance(enrichment_result, Exception):
+        logger.error(f"Enrichment failed for {company_name}: {enrichment_result}")
+        job["enrichment_success"] = False
+        job["enrichment_error"] = str(enrichment_result)
+    elif enrichment_result["company_id"]:
+        # Success - link job to company
+        job["company_id"] = enrichment_result["company_id"]
+        job["company_data"] = enrichment_result["company_data"]
+        job["enrichment_success"] = True
+        job["contacts_count"] = enrichment_result["contacts_count"]
+
+        # Check if company was enriched via Apollo
+        company_data = enrichment_result.get("company_data")
+        if company_data and hasattr(company_data, 'enrichment_source') and company_data.enrichment_source == "apollo":
+            job["apollo_enriched"] = True
+    else:
         job["enrichment_success"] = False
-        job["enrichment_error"] = str(e)
 
     return job
 
@@ -70,13 +86,9 @@ async def enrichment_node(state: Dict[str, Any]) -> Dict[str, Any]:
         state["enriched_jobs"] = []
         return state
 
-    # Process jobs in parallel batches with aggressive caching optimization
-    enriched_jobs = await parallel_processor.process_jobs_in_batches(
-        jobs=deduplicated_jobs,
-        processor_func=enrich_single_job,
-        batch_size=10,  # Larger batches since cache reduces API calls
-        max_concurrent_batches=5  # More aggressive since cache handles duplicates
-    )
+    # Enrich each distinct company once, then link every job to its company's result
+    results = await enrich_companies([job.get("company") for job in deduplicated_jobs])
+    enriched_jobs = [apply_enrichment(job, results.get(job.get("company"))) for job in deduplicated_jobs]
 
     # Calculate enrichment statistics
     enrichment_stats = {
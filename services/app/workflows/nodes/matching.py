@@ -13,7 +13,8 @@ from sentence_transformers import SentenceTransformer
 
 from ...utils.parallel_processing import parallel_processor, performance_monitor
 from ...utils.caching import cache_manager, cached_embedding
-from ...config.database import get_database
+from ...config.database import get_database, ensure_database_connection
+from ...config.constants import COLLECTIONS
 
 logger = logging.getLogger(__name__)
 
@@ -223,15 +224,8 @@ async def matching_node(state: Dict[str, Any]) -> Dict[str, Any]:
 
     # Get real candidates from database
     try:
-        from motor.motor_asyncio import AsyncIOMotorClient
-        import os
-        from dotenv import load_dotenv
-
-        load_dotenv()
-        mongodb_uri = os.getenv("MONGODB_URI")
-        client = AsyncIOMotorClient(mongodb_uri)
-        db = client.ai_recruitment
-        candidates_collection = db.candidates
+        # Reuse the application's shared client instead of opening a new pool per run
+        candidates_collection = ensure_database_connection()[COLLECTIONS["candidates"]]
 
         # Fetch all candidates (removed availability filter - was blocking all matches)
         candidates_cursor = candidates_collection.find({})